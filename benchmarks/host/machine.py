@@ -0,0 +1,116 @@
+"""
+Host stand-in for the MicroPython `machine` module, just enough for the
+Pico:ed drivers to run under CPython. The I2C bus keeps a copy of the
+registers of each device so reads return what was written.
+"""
+
+
+class I2C():
+
+    def __init__(self, *args, **kwargs):
+        self._devices = {}  # 地址 -> [当前 bank, {bank: bytearray(256)}]
+
+    def _device(self, addr):
+        device = self._devices.get(addr)
+        if device is None:
+            device = self._devices[addr] = [0, {}]
+        return device
+
+    def _write(self, addr, memaddr, buf):
+        device = self._device(addr)
+        if memaddr == 0xFD:  # IS31FL3731 的 bank 选择寄存器
+            device[0] = buf[0]
+            return
+        bank = device[1].setdefault(device[0], bytearray(256))
+        bank[memaddr:memaddr + len(buf)] = bytes(buf)
+
+    def writeto(self, addr, buf, stop=True):
+        buf = bytes(buf)
+        if buf:
+            self._write(addr, buf[0], buf[1:])
+        return 1
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self._write(addr, memaddr, buf)
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        device = self._device(addr)
+        if memaddr == 0xFD:
+            return bytes([device[0]])
+        bank = device[1].setdefault(device[0], bytearray(256))
+        return bytes(bank[memaddr:memaddr + nbytes])
+
+    def readfrom(self, addr, nbytes, stop=True):
+        return bytes(nbytes)
+
+    def scan(self):
+        return list(self._devices)
+
+
+class Pin():
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self._value = 1 if value is None else value
+        self.handler = None
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = value
+        return None
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def toggle(self):
+        self._value ^= 1
+
+    def irq(self, handler=None, trigger=0, hard=False):
+        self.handler = handler
+
+    def drive(self, value):
+        """Sets the level seen by the driver and fires the pin interrupt, like a real edge"""
+        if value != self._value:
+            self._value = value
+            if self.handler is not None:
+                self.handler(self)
+
+
+class PWM():
+
+    def __init__(self, pin):
+        self.calls = 0
+
+    def duty_u16(self, value):
+        self.calls += 1
+
+    def freq(self, value):
+        self.calls += 1
+
+    def deinit(self):
+        pass
+
+
+class Timer():
+    """Never fires on its own; the benchmarks play melodies in the foreground,
+    and button presses last longer than the debounce window."""
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1):
+        self.callback = None
+
+    def init(self, mode=ONE_SHOT, period=-1, callback=None):
+        self.callback = callback
+
+    def deinit(self):
+        self.callback = None
@@ -0,0 +1,12 @@
+"""
+Host stand-in for the MicroPython `micropython` module. There is no viper
+emitter, so `picoed.kernels` falls back to its plain Python kernels.
+"""
+
+
+def const(value):
+    return value
+
+
+def schedule(function, argument):
+    function(argument)
@@ -0,0 +1,28 @@
+"""
+Host stand-in for the MicroPython `uasyncio` module.
+"""
+
+from asyncio import *  # noqa: F401,F403
+import asyncio as _asyncio
+import utime
+
+
+async def sleep_ms(ms):
+    utime.sleep_ms(ms)
+    await _asyncio.sleep(0)
+
+
+class ThreadSafeFlag():
+
+    def __init__(self):
+        self._event = _asyncio.Event()
+
+    def set(self):
+        self._event.set()
+
+    def clear(self):
+        self._event.clear()
+
+    async def wait(self):
+        await self._event.wait()
+        self._event.clear()
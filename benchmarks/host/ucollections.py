@@ -0,0 +1,5 @@
+"""
+Host stand-in for the MicroPython `ucollections` module.
+"""
+
+from collections import OrderedDict, deque, namedtuple  # noqa: F401
@@ -0,0 +1,40 @@
+"""
+Host stand-in for the MicroPython `utime` module. Time is virtual: it only
+moves when the drivers sleep, so frame pacing never drops frames and the
+benchmark results do not depend on the speed of the host.
+"""
+
+_TICKS_MAX = 0x3FFFFFFF
+_TICKS_HALF = 0x20000000
+
+_now_us = 0
+
+
+def ticks_us():
+    return _now_us & _TICKS_MAX
+
+
+def ticks_ms():
+    return (_now_us // 1000) & _TICKS_MAX
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+
+def sleep_us(us):
+    global _now_us
+    if us > 0:
+        _now_us += int(us)
+
+
+def sleep_ms(ms):
+    sleep_us(ms * 1000)
+
+
+def sleep(seconds):
+    sleep_us(seconds * 1000000)
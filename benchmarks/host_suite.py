@@ -0,0 +1,213 @@
+"""
+`benchmarks.host_suite`
+====================================================
+
+Runs the Pico:ed drivers under CPython, against the stand-in modules in
+benchmarks/host, and reports the I2C transactions, bytes and CPU time per
+frame of the standard workloads (per note for the melody, with the buzzer
+PWM calls). Time on the host is virtual, so the counts are exact and
+repeatable; the CPU time only compares runs on the same machine. Run it
+from anywhere with:
+
+    python3 benchmarks/host_suite.py
+
+"""
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [os.path.join(HERE, 'host'), ROOT]
+
+from machine import I2C, Pin  # noqa: E402
+from picoed.i2cstats import I2CStats  # noqa: E402
+from picoed.display import Display, Image  # noqa: E402
+from picoed.music import Music  # noqa: E402
+from picoed.button import Button  # noqa: E402
+from picoed.tiled import VirtualDisplay  # noqa: E402
+from picoed.worker import RenderWorker  # noqa: E402
+
+sys.modules['picoed.display'].FONTS_BIN = os.path.join(ROOT, 'picoed', 'fonts.bin')
+
+CJK_TEXT = '你好世界'
+CJK_FONTS = {char: bytes((i * 37 + j * 11) & 0xFF for j in range(32)) for i, char in enumerate(CJK_TEXT)}
+SCROLL_TEXT = 'Hello, Pico:ed! 0123456789'
+STATIC_ROUNDS = 50
+COUNTER_ROUNDS = 200
+BUTTON_PRESSES = 100
+WORKER_FRAMES = 50
+
+
+def _counted_flips(display):
+    # 统计 _flip 的次数，也就是实际写出的帧数
+    flips = [0]
+    flip = display._flip
+
+    def counted():
+        flips[0] += 1
+        flip()
+    display._flip = counted
+    return flips
+
+
+def _display():
+    stats = I2CStats(I2C(0))
+    display = Display(stats)
+    return display, stats, _counted_flips(display)
+
+
+def static_image():
+    display, stats, flips = _display()
+    stats.reset()
+    start = time.process_time_ns()
+    for _ in range(STATIC_ROUNDS):
+        display.show(Image.HEART)
+    return flips[0], stats.transactions, stats.bytes, 0, time.process_time_ns() - start
+
+
+def scroll():
+    display, stats, flips = _display()
+    stats.reset()
+    start = time.process_time_ns()
+    display.scroll(SCROLL_TEXT)
+    return flips[0], stats.transactions, stats.bytes, 0, time.process_time_ns() - start
+
+
+def smooth_scroll():
+    display, stats, flips = _display()
+    stats.reset()
+    start = time.process_time_ns()
+    display.smooth_scroll(SCROLL_TEXT)
+    return flips[0], stats.transactions, stats.bytes, 0, time.process_time_ns() - start
+
+
+def counter():
+    # 计数器每次加一，每次更新算一帧
+    display, stats, flips = _display()
+    display.show_number(0)
+    stats.reset()
+    start = time.process_time_ns()
+    for value in range(1, COUNTER_ROUNDS + 1):
+        display.show_number(value)
+    return COUNTER_ROUNDS, stats.transactions, stats.bytes, 0, time.process_time_ns() - start
+
+
+def vertical_cjk_scroll():
+    display, stats, flips = _display()
+    stats.reset()
+    start = time.process_time_ns()
+    display.vertical_scroll(CJK_TEXT, CJK_FONTS)
+    return flips[0], stats.transactions, stats.bytes, 0, time.process_time_ns() - start
+
+
+def tiled():
+    # 四块面板，只有第一块上的方块在移动
+    stats = I2CStats(I2C(0))
+    screen = VirtualDisplay(stats, (0x74, 0x75, 0x76, 0x77))
+    screen.flush()
+    stats.reset()
+    start = time.process_time_ns()
+    for x in range(15):
+        screen.framebuf.fill(0)
+        screen.framebuf.fill_rect(x, 2, 3, 3, 30)
+        screen.flush()
+    return 15, stats.transactions, stats.bytes, 0, time.process_time_ns() - start
+
+
+def worker():
+    # 画布交给 RenderWorker 在另一个线程刷新；CPU 时间只算工作线程里 flush 的耗时
+    display, stats, _ = _display()
+    cpu = [0]
+    flush = display.flush
+
+    def timed(canvas=None):
+        start = time.thread_time_ns()
+        flush(canvas)
+        cpu[0] += time.thread_time_ns() - start
+    display.flush = timed
+    render = RenderWorker(display)
+    render.start()
+    try:
+        try:
+            render.submit(bytes(10))
+        except ValueError:
+            pass
+        else:
+            raise RuntimeError('a short canvas was accepted')
+        canvas = bytearray(119)
+        stats.reset()
+        for frame in range(WORKER_FRAMES):
+            canvas[frame % 119] = 30
+            render.submit(canvas)
+            while render.busy():
+                time.sleep(0)
+        result = (WORKER_FRAMES, stats.transactions, stats.bytes, 0, cpu[0])
+        render.submit_text(SCROLL_TEXT)
+        while render.busy():
+            time.sleep(0)
+        render.submit(canvas)  # 新的画布让正在进行的滚动提前结束
+        while render.busy():
+            time.sleep(0)
+    finally:
+        render.stop()
+    if render.error is not None:
+        raise render.error
+    return result
+
+
+def melody():
+    # 每个音符算一帧
+    music = Music(Pin(3, Pin.OUT))
+    notes = len(Music.compile(Music.NYAN)) // 2
+    music._pwm.calls = 0
+    start = time.process_time_ns()
+    music.play(Music.NYAN)
+    return notes, 0, 0, music._pwm.calls, time.process_time_ns() - start
+
+
+def button():
+    # 每次按下和松开算一帧，测量中断处理的开销
+    import utime
+    pin = Pin(20, Pin.IN, Pin.PULL_UP)
+    button = Button(pin, irq=True)
+    start = time.process_time_ns()
+    for _ in range(BUTTON_PRESSES):
+        pin.drive(0)
+        utime.sleep_ms(50)
+        pin.drive(1)
+        utime.sleep_ms(400)
+        while button.get_event() is not None:
+            pass
+    cpu = time.process_time_ns() - start
+    if button.get_presses() != BUTTON_PRESSES:
+        raise RuntimeError('button presses were lost')
+    return BUTTON_PRESSES * 2, 0, 0, 0, cpu
+
+
+WORKLOADS = (
+    ('static image', static_image),
+    ('scroll', scroll),
+    ('smooth scroll', smooth_scroll),
+    ('counter', counter),
+    ('vertical CJK scroll', vertical_cjk_scroll),
+    ('tiled 4 panels', tiled),
+    ('render worker', worker),
+    ('melody', melody),
+    ('button', button),
+)
+
+
+def run():
+    print('{:<22}{:>8}{:>10}{:>12}{:>10}{:>10}'.format(
+        'workload', 'frames', 'tx/frame', 'bytes/frame', 'pwm/frame', 'us/frame'))
+    for name, workload in WORKLOADS:
+        frames, transactions, size, pwm, cpu = workload()
+        frames = max(frames, 1)
+        print('{:<22}{:>8}{:>10.2f}{:>12.1f}{:>10.2f}{:>10.1f}'.format(
+            name, frames, transactions / frames, size / frames, pwm / frames, cpu / 1000 / frames))
+
+
+if __name__ == '__main__':
+    run()
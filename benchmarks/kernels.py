@@ -0,0 +1,50 @@
+"""
+`benchmarks.kernels`
+====================================================
+
+Per-frame CPU cost of the render kernels in `picoed.kernels`, for the plain
+Python version and, where the firmware has the viper emitter, the viper one.
+Run it on a Pico:ed with:
+
+    mpremote run benchmarks/kernels.py
+
+"""
+
+import utime
+from picoed import kernels
+from picoed.display import Image, _COLUMN_LUT, _PIXEL_LUT
+
+ROUNDS = 200
+
+
+def _time(name, kernel, *args):
+    start = utime.ticks_us()
+    for _ in range(ROUNDS):
+        kernel(*args)
+    cost = utime.ticks_diff(utime.ticks_us(), start) / ROUNDS
+    print('{:<16}{:>10.1f} us/frame'.format(name, cost))
+
+
+def run():
+    columns = Image.CHESSBOARD  # 最多的亮像素
+    rows = b'\x55\xaa' * 7
+    out = bytearray(144)
+    other = bytearray(range(144))
+    scroll_buf = bytearray(17)
+    canvas = bytearray(range(119))
+    table = bytes(255 - i for i in range(256))
+    variants = [('python', kernels.expand_columns_py, kernels.expand_rows_py, kernels.scatter_py, kernels.translate_py, kernels.shift_py, kernels.blend_py)]
+    if kernels.viper is not None:
+        v = kernels.viper
+        variants.append(('viper', v.expand_columns, v.expand_rows, v.scatter, v.translate, v.shift, v.blend))
+    for label, expand_columns, expand_rows, scatter, translate, shift, blend in variants:
+        print(label)
+        _time('expand_columns', expand_columns, columns, _COLUMN_LUT, out, 17, 30)
+        _time('expand_rows', expand_rows, rows, _PIXEL_LUT, out, 30)
+        _time('scatter', scatter, canvas, _PIXEL_LUT, out, 119)
+        _time('translate', translate, other, table, out, 144)
+        _time('shift', shift, scroll_buf, 1)
+        _time('blend', blend, out, other, 144, 128)
+
+
+run()
@@ -4,6 +4,11 @@
 
 The Pico:ed build-in modules for MicroPython.
 
+The built-in objects are created the first time they are used, so importing
+picoed does not touch the I2C bus, the buzzer or the buttons. They are
+stand-ins that pass attribute reads and writes on to the real objects, so
+`isinstance(display, Display)` is False.
+
 """
 
 from machine import I2C, Pin
@@ -19,10 +24,50 @@ BUTTON_B = Pin(21, Pin.IN, Pin.PULL_UP)
 LED = Pin(25, Pin.OUT)
 BUZZER = Pin(3, Pin.OUT)
 
-i2c = I2C(0, scl=I2C0_SCL, sda=I2C0_SDA)
-display = Display(i2c)
 
-button_a = Button(BUTTON_A)
-button_b = Button(BUTTON_B)
-led = Led(LED)
-music = Music(BUZZER)
+class _Lazy():
+    """Creates an object on first use and forwards attribute access to it"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._object = None
+
+    def _get(self):
+        if self._object is None:
+            self._object = self._factory()
+            self._factory = None
+        return self._object
+
+    def __getattr__(self, name):
+        # 只在代理自身没有这个属性时调用；其他值每次都从真实对象读取，保持最新
+        value = getattr(self._get(), name)
+        if callable(value):
+            object.__setattr__(self, name, value)  # 缓存绑定方法，之后直接命中
+        return value
+
+    def _forget(self, name):
+        # 丢掉缓存的方法，下次读取时重新从真实对象获取
+        try:
+            object.__delattr__(self, name)
+        except AttributeError:
+            pass
+
+    def __setattr__(self, name, value):
+        if name == '_factory' or name == '_object':
+            object.__setattr__(self, name, value)
+            return
+        setattr(self._get(), name, value)
+        self._forget(name)
+
+    def __delattr__(self, name):
+        delattr(self._get(), name)
+        self._forget(name)
+
+
+i2c = _Lazy(lambda: I2C(0, scl=I2C0_SCL, sda=I2C0_SDA))
+display = _Lazy(lambda: Display(i2c._get()))
+
+button_a = _Lazy(lambda: Button(BUTTON_A, irq=True))
+button_b = _Lazy(lambda: Button(BUTTON_B, irq=True))
+led = _Lazy(lambda: Led(LED))
+music = _Lazy(lambda: Music(BUZZER))
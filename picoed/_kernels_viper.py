@@ -0,0 +1,79 @@
+"""
+`picoed._kernels_viper`
+====================================================
+
+Viper versions of the kernels in `picoed.kernels`, with the same arguments.
+Importing this module fails on ports without the viper code emitter.
+
+"""
+
+import micropython
+
+
+@micropython.viper
+def expand_columns(columns, lut, out, count: int, value: int):
+    c = ptr8(columns)
+    l = ptr8(lut)
+    o = ptr8(out)
+    index = 0
+    for x in range(count):
+        col = c[x] & 0x7F
+        y = 0
+        while col:
+            if col & 1:
+                o[l[index + y]] = value
+            col >>= 1
+            y += 1
+        index += 7
+
+
+@micropython.viper
+def expand_rows(rows, lut, out, value: int):
+    r = ptr8(rows)
+    l = ptr8(lut)
+    o = ptr8(out)
+    for y in range(7):
+        for i in range(2):
+            col = r[2 * y + i]
+            index = y * 17 + 16 - 8 * i
+            x = 0
+            while col:
+                if col & 1:
+                    o[l[index - x]] = value
+                col >>= 1
+                x += 1
+
+
+@micropython.viper
+def scatter(src, lut, out, count: int):
+    s = ptr8(src)
+    l = ptr8(lut)
+    o = ptr8(out)
+    for index in range(count):
+        o[l[index]] = s[index]
+
+
+@micropython.viper
+def translate(src, table, out, count: int):
+    s = ptr8(src)
+    t = ptr8(table)
+    o = ptr8(out)
+    for index in range(count):
+        o[index] = t[s[index]]
+
+
+@micropython.viper
+def shift(buf, step: int):
+    b = ptr8(buf)
+    n = int(len(buf)) - step
+    for index in range(n):
+        b[index] = b[index + step]
+
+
+@micropython.viper
+def blend(dst, src, count: int, alpha: int):
+    d = ptr8(dst)
+    s = ptr8(src)
+    keep = 256 - alpha
+    for index in range(count):
+        d[index] = (d[index] * keep + s[index] * alpha) >> 8
@@ -6,13 +6,109 @@ MicroPython driver for the Pico:ed built-in buttons.
 
 """
 
+import utime
+import uasyncio
+from machine import Pin, Timer
+from micropython import const
+
+_QUEUE_SIZE = const(16)  # 事件队列的长度，满了丢弃最早的事件
+DEBOUNCE_MS = const(20)
+LONG_PRESS_MS = const(800)
+DOUBLE_CLICK_MS = const(300)
+
 
 class Button():
     """"Supports the Pico:ed button"""
 
-    def __init__(self, pin):
+    # 事件
+    PRESS = 1
+    RELEASE = 2
+    LONG_PRESS = 3
+    DOUBLE_CLICK = 4
+
+    def __init__(self, pin, irq=False, debounce=DEBOUNCE_MS, long_press=LONG_PRESS_MS, double_click=DOUBLE_CLICK_MS):
+        """
+        :param pin: the Pin of the button, pulled up
+        :param irq: True to catch presses with a pin interrupt instead of polling
+        :param debounce: edges closer than this many ms are bounces; the level is
+            read again when the window ends, so a missed change is still reported
+        :param long_press: LONG_PRESS is queued once the button has been held this many ms
+        :param double_click: a press within this many ms of the last release also queues DOUBLE_CLICK
+        """
         self._pin = pin
         self._last_pressed = False
+        self._irq = irq
+        if not irq:
+            return
+        self._debounce = debounce
+        self._long_press = long_press
+        self._double_click = double_click
+        self._events = bytearray(_QUEUE_SIZE)
+        self._head = 0
+        self._tail = 0
+        self._presses = 0
+        self._was_pressed = False
+        self._down = not pin.value()
+        self._long_sent = True  # 本次按下是否已经报告过 LONG_PRESS
+        now = utime.ticks_ms()
+        self._changed_at = utime.ticks_add(now, -debounce)
+        self._pressed_at = now
+        self._released_at = utime.ticks_add(now, -double_click)
+        self._flag = None  # wait_pressed 用的 ThreadSafeFlag
+        self._timer = Timer()  # 去抖窗口结束和长按到时后检查按键
+        self._check_ref = self._check  # 预先绑定，中断中不分配内存
+        pin.irq(self._handler, Pin.IRQ_FALLING | Pin.IRQ_RISING)
+
+    def _push(self, event):
+        # 中断中调用，不分配内存
+        self._events[self._tail] = event
+        self._tail = (self._tail + 1) % _QUEUE_SIZE
+        if self._tail == self._head:
+            self._head = (self._head + 1) % _QUEUE_SIZE
+
+    def _arm(self, period):
+        self._timer.init(mode=Timer.ONE_SHOT, period=period, callback=self._check_ref)
+
+    def _change(self, down, now):
+        # 接受一次按下或松开，然后在去抖窗口结束时再读一次电平
+        self._changed_at = now
+        self._down = down
+        if down:
+            self._presses += 1
+            self._was_pressed = True
+            self._long_sent = False
+            self._push(Button.PRESS)
+            if utime.ticks_diff(now, self._released_at) < self._double_click:
+                self._push(Button.DOUBLE_CLICK)
+            self._pressed_at = now
+            if self._flag is not None:
+                self._flag.set()
+        else:
+            self._released_at = now
+            self._push(Button.RELEASE)
+        self._arm(self._debounce)
+
+    def _handler(self, pin):
+        down = not pin.value()
+        if down == self._down:
+            return
+        now = utime.ticks_ms()
+        if utime.ticks_diff(now, self._changed_at) < self._debounce:
+            return  # 抖动，窗口结束时 _check 会补上漏掉的变化
+        self._change(down, now)
+
+    def _check(self, _):
+        now = utime.ticks_ms()
+        down = not self._pin.value()
+        if down != self._down:
+            self._change(down, now)
+        elif down and not self._long_sent:
+            remaining = self._long_press - utime.ticks_diff(now, self._pressed_at)
+            if remaining > 0:
+                self._arm(remaining)
+            else:
+                self._long_sent = True
+                self._push(Button.LONG_PRESS)
 
     def is_pressed(self):
         """Returns True when the key is pressed"""
@@ -20,9 +116,48 @@ class Button():
 
     def was_pressed(self):
         """Returns True when the key was pressed"""
+        if self._irq:
+            pressed = self._was_pressed
+            self._was_pressed = False
+            return pressed
         if not self._pin.value() and not self._last_pressed:
             self._last_pressed = True
             return True
         if self._pin.value():
             self._last_pressed = False
         return False
+
+    def get_presses(self):
+        """Returns the number of presses since the last call, and resets it.
+        Only available with irq=True.
+        """
+        if not self._irq:
+            raise RuntimeError("get_presses needs Button(pin, irq=True)")
+        presses = self._presses
+        self._presses = 0
+        return presses
+
+    def get_event(self):
+        """Returns the oldest queued event (PRESS, RELEASE, LONG_PRESS or
+        DOUBLE_CLICK), or None when the queue is empty.
+        Only available with irq=True.
+        """
+        if not self._irq:
+            raise RuntimeError("get_event needs Button(pin, irq=True)")
+        if self._head == self._tail:
+            return None
+        event = self._events[self._head]
+        self._head = (self._head + 1) % _QUEUE_SIZE
+        return event
+
+    async def wait_pressed(self):
+        """Waits until the key is pressed, letting other tasks run."""
+        if not self._irq:
+            while not self.was_pressed():
+                await uasyncio.sleep_ms(10)
+            return
+        if self._flag is None:
+            self._flag = uasyncio.ThreadSafeFlag()
+        self._flag.clear()  # 只等下一次按下
+        await self._flag.wait()
+        self._was_pressed = False
@@ -0,0 +1,80 @@
+"""
+`picoed.clock`
+====================================================
+
+Frame pacing for the Pico:ed display.
+
+"""
+
+import utime
+import uasyncio
+
+
+class FrameClock():
+    """Paces frames against absolute deadlines, one every 1000 / fps ms.
+    A slow frame does not push the following ones back; when a frame ends
+    after the next deadline, `tick()` tells the caller how many frames to
+    drop so the animation keeps its wall-clock speed.
+    """
+
+    def __init__(self, fps=15, skip=True):
+        self.period = 1000 // fps
+        self.skip = skip
+        self.reset()
+
+    def reset(self):
+        """Restarts the clock and clears the statistics."""
+        self.frames = 0  # 已绘制的帧数
+        self.late = 0  # 超过截止时间才画完的帧数
+        self.dropped = 0  # 为追赶进度丢掉的帧数
+        self.worst = 0  # 最长的一帧，毫秒
+        self._start = utime.ticks_ms()
+        self._frame_start = self._start
+        self._deadline = self._start
+
+    def tick(self):
+        """Marks the end of a frame and moves on to the next deadline.
+        Returns the number of frames to drop to catch up, 0 while less than a
+        whole period behind; a late frame is then followed at once by the next.
+        """
+        now = utime.ticks_ms()
+        self.frames += 1
+        frame_time = utime.ticks_diff(now, self._frame_start)
+        if frame_time > self.worst:
+            self.worst = frame_time
+        self._deadline = utime.ticks_add(self._deadline, self.period)
+        behind = utime.ticks_diff(now, self._deadline)
+        if behind <= 0:
+            return 0
+        self.late += 1
+        if not self.skip or self.period <= 0:
+            self._deadline = now  # 不丢帧时从现在重新计时
+            return 0
+        # 落后不到一帧时马上画下一帧，落后满一帧才丢帧
+        drop = behind // self.period
+        if drop:
+            self._deadline = utime.ticks_add(self._deadline, drop * self.period)
+            self.dropped += drop
+        return drop
+
+    def idle(self):
+        """Returns the ms left until the next deadline, 0 if it has passed."""
+        idle_time = utime.ticks_diff(self._deadline, utime.ticks_ms())
+        return idle_time if idle_time > 0 else 0
+
+    def wait(self):
+        """Sleeps until the next deadline."""
+        idle_time = self.idle()
+        if idle_time:
+            utime.sleep_ms(idle_time)
+        self._frame_start = utime.ticks_ms()
+
+    async def wait_async(self):
+        """Yields to other tasks until the next deadline."""
+        await uasyncio.sleep_ms(self.idle())
+        self._frame_start = utime.ticks_ms()
+
+    def fps(self):
+        """Returns the achieved frames per second since the clock started."""
+        elapsed = utime.ticks_diff(utime.ticks_ms(), self._start)
+        return self.frames * 1000 / elapsed if elapsed > 0 else 0
@@ -7,13 +7,122 @@ MicroPython driver for the Pico:ed matrix display.
 """
 
 import utime
+import uasyncio
+import framebuf
+from ucollections import OrderedDict
 from micropython import const
 from .is31fl3731 import IS31FL3731
+from .clock import FrameClock
+from . import kernels
 
 OFFSET_BYTES = const(2)
 FONT_BYTES = const(7)
+FONTS_V2 = const(0xFFFF)  # v2 字库的标记，原格式中不可能出现这个偏移
+_V2_INDEX = const(4)  # v2 字库中码位索引的地址
+_FRAME_BYTES = const(144)  # 每帧 144 个 PWM 寄存器
+_WIDTH = const(17)
+_HEIGHT = const(7)
+_PIXELS = const(119)  # 17 x 7
+_AUTOPLAY_BATCH = const(4)  # 自动播放时每批装入的帧数
+_AUTOPLAY_MIN_MS = const(11)  # 芯片自动播放的延时以 11ms 为单位，1->64 个单位
+_AUTOPLAY_MAX_MS = const(704)
+_FLIP_FRAMES = (0, 1)  # 双缓冲使用的两帧
+_NUMBER_CHARS = '0123456789-.'  # show_number 预先生成字模的字符
 BLANK_FONT = b'\x7f\x41\x41\x41\x41\x41\x7f'
+_LEVELS = bytes(int(level * 255 / 9) for level in range(10))  # 图片亮度 0-9 对应的 PWM 值
 FONTS_BIN = '/picoed/fonts.bin'
+_BLANK_BUFFER = bytes(_FRAME_BYTES)
+GLYPH_CACHE_BYTES = const(2048)  # 字模缓存的默认容量
+_GLYPH_OVERHEAD = const(32)  # 每个缓存项除字模本身外大约占用的内存
+STRIP_CACHE_SIZE = const(4)  # 缓存最近渲染的文本条数
+
+
+def _autoplay_delay(fps):
+    # 自动播放滚动时每帧的延时，限制在芯片支持的范围内
+    return min(max(1000 // fps, _AUTOPLAY_MIN_MS), _AUTOPLAY_MAX_MS)
+
+
+def _check_delay(delay):
+    # 在装入任何帧之前检查，避免芯片状态改了一半才报错
+    if not _AUTOPLAY_MIN_MS <= delay <= _AUTOPLAY_MAX_MS:
+        raise ValueError("Delay out of range")
+
+
+def _brightness_table(level, gamma):
+    # 亮度表：先做伽马校正再按 level 缩放，亮的像素至少保留 1
+    table = bytearray(256)
+    for value in range(1, 256):
+        if gamma:
+            mapped = int((value / 255) ** 2.2 * level + 0.5)
+        else:
+            mapped = (value * level + 127) // 255
+        table[value] = mapped if mapped or not level else 1
+    return bytes(table)
+
+
+class GlyphCache():
+    """A least recently used cache of glyphs with a byte budget.
+    Each entry costs the length of the glyph plus a fixed overhead.
+    """
+
+    def __init__(self, budget=GLYPH_CACHE_BYTES):
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._glyphs = OrderedDict()  # 字 -> (来源字库, 字模)，最近使用的在最后
+
+    def get(self, char, fonts=None):
+        """Returns the cached glyph of char from fonts, or None.
+        :param fonts: the custom fonts dict the glyph came from, None for the built-in fonts
+        """
+        entry = self._glyphs.pop(char, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._glyphs[char] = entry  # 移到最后
+        if entry[0] is not fonts:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, char, glyph, fonts=None):
+        """Adds a glyph, evicting the least recently used ones over the budget."""
+        old = self._glyphs.pop(char, None)
+        if old is not None:
+            self.size -= len(old[1]) + _GLYPH_OVERHEAD
+        cost = len(glyph) + _GLYPH_OVERHEAD
+        if cost > self.budget:
+            return
+        self._glyphs[char] = (fonts, glyph)
+        self.size += cost
+        while self.size > self.budget:
+            oldest = next(iter(self._glyphs))
+            self.size -= len(self._glyphs.pop(oldest)[1]) + _GLYPH_OVERHEAD
+
+    def clear(self):
+        """Removes all glyphs and resets the counters."""
+        self._glyphs = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+
+class TextStrip():
+    """Text rendered to display columns, one byte per column.
+    Returned by `Display.render_text` and accepted by `Display.scroll`.
+    """
+
+    __slots__ = ('text', 'columns', 'fonts')
+
+    def __init__(self, text, columns, fonts=None):
+        self.text = text
+        self.columns = columns
+        self.fonts = fonts
+
+    def __len__(self):
+        return len(self.columns)
 
 
 class Image():
@@ -46,18 +155,183 @@ class Image():
     SUPERCILIOUS_LOOK = b"\x00\x00\x00\x0E\x0C\x0E\x00\x20\x20\x20\x00\x0E\x0C\x0E\x00\x00\x00"
     EXCITED = b"\x60\x70\x70\x3E\x01\x06\x30\x50\x50\x50\x30\x06\x01\x3E\x70\x70\x60"
 
-    def __new__(cls, value=None):
-        if value is not None and isinstance(value, str):
-            data = []
-            for y in range(7):
-                if y < 6:
-                    if value[(y + 1) * 18 - 1] != ":":
-                        raise ValueError('Each line of data must be separated with a ":"')
-                for x in range(17):
-                    data.append([x, y, int(value[y * 18 + x])])
-            return data
+    __slots__ = ('_width', '_height', '_pixels')
+
+    def __init__(self, *args):
+        """Creates an image.
+        Image() is a blank image of the display size.
+        Image(string) takes rows of digits 0->9 separated with ":", like "09090:99999:09990".
+        Image(columns) takes bytes with one byte per column, like `Image.HEART`.
+        Image(width, height, buffer=None) takes the brightness of each pixel row by row.
+        """
+        if not args:
+            args = (Display.width, Display.height)
+        value = args[0]
+        if isinstance(value, str):
+            rows = value.rstrip(':').split(':')
+            width = len(rows[0])
+            for row in rows:
+                if len(row) != width:
+                    raise ValueError('Each line of data must be separated with a ":"')
+            self._init(width, len(rows))
+            pixels = self._pixels
+            index = 0
+            for row in rows:
+                for char in row:
+                    pixels[index] = int(char)
+                    index += 1
+        elif isinstance(value, (bytes, bytearray)):
+            self._init(len(value), Display.height)
+            pixels = self._pixels
+            for x in range(self._width):
+                col = value[x]
+                for y in range(self._height):
+                    if col >> y & 1:
+                        pixels[y * self._width + x] = 9
         else:
-            return [[0, 0, 0]]
+            self._init(value, args[1], args[2] if len(args) > 2 else None)
+
+    def _init(self, width, height, buffer=None):
+        if width < 0 or height < 0:
+            raise ValueError('Image size must not be negative')
+        self._width = width
+        self._height = height
+        if buffer is None:
+            self._pixels = bytearray(width * height)
+        else:
+            if len(buffer) != width * height:
+                raise ValueError('Image data is incorrect size')
+            self._pixels = bytearray(buffer)
+
+    def width(self):
+        """Returns the number of columns in the image."""
+        return self._width
+
+    def height(self):
+        """Returns the number of rows in the image."""
+        return self._height
+
+    def get_pixel(self, x, y):
+        """Returns the brightness 0->9 of the pixel at column x and row y."""
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise IndexError('index out of bounds')
+        return self._pixels[y * self._width + x]
+
+    def set_pixel(self, x, y, value):
+        """Sets the brightness 0->9 of the pixel at column x and row y."""
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise IndexError('index out of bounds')
+        if not 0 <= value <= 9:
+            raise ValueError('brightness out of bounds')
+        self._pixels[y * self._width + x] = value
+
+    def fill(self, value):
+        """Sets the brightness 0->9 of all pixels."""
+        if not 0 <= value <= 9:
+            raise ValueError('brightness out of bounds')
+        pixels = self._pixels
+        for index in range(len(pixels)):
+            pixels[index] = value
+
+    def copy(self):
+        """Returns an exact copy of the image."""
+        return Image(self._width, self._height, self._pixels)
+
+    def blit(self, src, x, y, w, h, xdest=0, ydest=0):
+        """Copies the w x h area at x, y of src to xdest, ydest of this image.
+        Pixels outside src read as 0, pixels outside this image are skipped.
+        """
+        src_width = src._width
+        src_height = src._height
+        src_pixels = src._pixels
+        pixels = self._pixels
+        for row in range(h):
+            ty = ydest + row
+            if not 0 <= ty < self._height:
+                continue
+            sy = y + row
+            for col in range(w):
+                tx = xdest + col
+                if not 0 <= tx < self._width:
+                    continue
+                sx = x + col
+                if 0 <= sx < src_width and 0 <= sy < src_height:
+                    pixels[ty * self._width + tx] = src_pixels[sy * src_width + sx]
+                else:
+                    pixels[ty * self._width + tx] = 0
+
+    def crop(self, x, y, w, h):
+        """Returns a new w x h image with the area at x, y of this image."""
+        image = Image(w, h)
+        image.blit(self, x, y, w, h)
+        return image
+
+    def _shifted(self, dx, dy):
+        image = Image(self._width, self._height)
+        image.blit(self, -dx, -dy, self._width, self._height)
+        return image
+
+    def shift_left(self, n):
+        """Returns a new image shifted left by n columns."""
+        return self._shifted(-n, 0)
+
+    def shift_right(self, n):
+        """Returns a new image shifted right by n columns."""
+        return self._shifted(n, 0)
+
+    def shift_up(self, n):
+        """Returns a new image shifted up by n rows."""
+        return self._shifted(0, -n)
+
+    def shift_down(self, n):
+        """Returns a new image shifted down by n rows."""
+        return self._shifted(0, n)
+
+    def invert(self):
+        """Returns a new image with the brightness of each pixel inverted."""
+        image = self.copy()
+        pixels = image._pixels
+        for index in range(len(pixels)):
+            pixels[index] = 9 - pixels[index]
+        return image
+
+    def __add__(self, other):
+        """Returns a new image with the brightness of both images added up to 9."""
+        if self._width != other._width or self._height != other._height:
+            raise ValueError('images must be the same size')
+        image = self.copy()
+        pixels = image._pixels
+        other_pixels = other._pixels
+        for index in range(len(pixels)):
+            value = pixels[index] + other_pixels[index]
+            pixels[index] = value if value < 9 else 9
+        return image
+
+    def __mul__(self, factor):
+        """Returns a new image with the brightness of each pixel multiplied by factor."""
+        if factor < 0:
+            raise ValueError('brightness multiplier must not be negative')
+        image = self.copy()
+        pixels = image._pixels
+        for index in range(len(pixels)):
+            value = int(pixels[index] * factor)
+            pixels[index] = value if value < 9 else 9
+        return image
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Image)
+            and self._width == other._width
+            and self._height == other._height
+            and self._pixels == other._pixels
+        )
+
+    def __repr__(self):
+        rows = []
+        for y in range(self._height):
+            start = y * self._width
+            rows.append(''.join(str(v) for v in self._pixels[start:start + self._width]))
+        return "Image('" + ':'.join(rows) + ":')"
 
 
 class Display(IS31FL3731):
@@ -67,19 +341,70 @@ class Display(IS31FL3731):
     height = 7
 
     _current_frame = 0
+    _autoplaying = False
+    _playing = False
+    frame_clock = None  # 最近一次滚动的 FrameClock，可读取实际帧率、迟到帧数等
+    _level = 255
+    _gamma = False
+    _table = None  # 写入芯片前的亮度表，None 表示原样写入
+    _mapped = None  # 按亮度表换算后的帧缓冲
+    _buffer_shown = False  # True 时帧缓冲就是正在显示的画面
+    _number_glyphs = None  # 数字、符号和小数点的列位图，第一次显示数字时生成
+    _number_columns = None  # show_number 正在显示的列位图，画了别的内容后为 None
+    _number_brightness = 0
 
     def _init(self, frames=None):
-        super()._init(frames)
-        with open(FONTS_BIN, 'rb') as f:
-            self._fonts_offset = int.from_bytes(f.read(OFFSET_BYTES), 'little')  # 字库前两位是字模的地址偏移
+        # 平时只用 0、1 两帧做双缓冲，其余的帧在自动播放用到时才初始化
+        super()._init(frames if frames else _FLIP_FRAMES)
+        self._buffer = bytearray(_FRAME_BYTES)  # 帧缓冲，与芯片的 PWM 寄存器一一对应
+        self.canvas = bytearray(_PIXELS)  # 画布，每个像素一字节亮度，按行排列
+        self.framebuf = framebuf.FrameBuffer(self.canvas, _WIDTH, _HEIGHT, framebuf.GS8)
+        self._code = bytearray(2)  # 读取 v2 索引用的缓冲区
+        self.glyph_cache = GlyphCache()
+        self._strips = OrderedDict()  # 文本 -> TextStrip，最近使用的在最后
+        self._fonts_offset = None  # 字库的文件头在第一次查字时才读取
+
+    def _read_fonts(self, f):
+        # 读取字库的文件头，判断字库的格式
+        f.seek(0)
+        self._fonts_offset = int.from_bytes(f.read(OFFSET_BYTES), 'little')  # 字库前两位是字模的地址偏移
+        if self._fonts_offset == FONTS_V2:
+            # v2 字库：按码位排序的索引留在文件里二分查找，不占用内存
+            self._fonts_count = int.from_bytes(f.read(2), 'little')
+            self._fonts_offset = _V2_INDEX + self._fonts_count * 2
+            self._fonts = None
+        else:
             f.seek(OFFSET_BYTES)
             self._fonts = f.read(self._fonts_offset - OFFSET_BYTES).decode('utf-8')  # 字库的字典，用于查找字模
-    
+
+    def _find_index(self, value, f):
+        # 在 v2 字库的码位索引中二分查找
+        code = ord(value)
+        buf = self._code
+        low = 0
+        high = self._fonts_count - 1
+        while low <= high:
+            mid = (low + high) >> 1
+            f.seek(_V2_INDEX + mid * 2)
+            f.readinto(buf)
+            mid_code = buf[0] | buf[1] << 8
+            if mid_code < code:
+                low = mid + 1
+            elif mid_code > code:
+                high = mid - 1
+            else:
+                return mid
+        return -1
+
     def _find_font(self, value, f):
-        if not self._fonts:
+        if self._fonts_offset is None:
+            self._read_fonts(f)
+        if self._fonts is None:
+            index_font = self._find_index(value, f)
+        elif not self._fonts:
             return None
-
-        index_font = self._fonts.find(value)
+        else:
+            index_font = self._fonts.find(value)
         if index_font < 0:
             return None
 
@@ -99,116 +424,544 @@ class Display(IS31FL3731):
             y = 7 - y
         return x * 16 + y
 
-    def _draw(self, buffer, brightness):
+    def _flip(self):
+        # 把帧缓冲一次性写入后台帧，然后切换显示
+        self._stop_autoplay()
         self._current_frame = 0 if self._current_frame else 1
-        self.frame(self._current_frame, show=False)
-        self.fill(0)
-        for x in range(self.width):
-            col = buffer[x]
-            for y in range(self.height):
-                bit = 1 << y & col
-                if bit:
-                    self.pixel(x, y, brightness)
+        self._write_color(self._output(self._buffer), self._current_frame)
         self.frame(self._current_frame, show=True)
+        self._buffer_shown = True
+        self._number_columns = None
+
+    def _output(self, buffer):
+        # 写入芯片前按亮度表换算，不改动帧缓冲本身
+        table = self._table
+        if table is None:
+            return buffer
+        kernels.translate(buffer, table, self._mapped, _FRAME_BYTES)
+        return self._mapped
+
+    def set_brightness(self, level=255, gamma=False):
+        """Dims the whole display without rendering again.
+        Every brightness is mapped through a table when it is written to the
+        chip, and the current picture is written again through the new table.
+        :param level: 0->255, 255 shows the brightness as drawn
+        :param gamma: True to correct for the eye, so that brightness steps look even
+        """
+        if not 0 <= level <= 255:
+            raise ValueError("Brightness out of range")
+        self._level = level
+        self._gamma = gamma
+        if level == 255 and not gamma:
+            self._table = None
+        else:
+            self._table = _brightness_table(level, gamma)
+            if self._mapped is None:
+                self._mapped = bytearray(_FRAME_BYTES)
+        if self._buffer_shown and not self._autoplaying:
+            self._write_color(self._output(self._buffer), self._current_frame)
+
+    def set_blink_mask(self, mask, frame=None):
+        """Sets the blink bits of all LEDs in one transfer, see `blink` for the rate.
+        Without a frame the mask is set on both frames used for double buffering,
+        so blinking carries on across show, scroll and flush.
+        """
+        if frame is not None:
+            super().set_blink_mask(mask, frame)
+            return
+        for frame in _FLIP_FRAMES:
+            super().set_blink_mask(mask, frame)
+
+    def get_brightness(self):
+        """Returns the level set by `set_brightness`."""
+        return self._level
+
+    def _render(self, buffer, brightness):
+        fb = self._buffer
+        fb[:] = _BLANK_BUFFER
+        kernels.expand_columns(buffer, _COLUMN_LUT, fb, min(len(buffer), _WIDTH), brightness)
+
+    def _render_image(self, image):
+        fb = self._buffer
+        fb[:] = _BLANK_BUFFER
+        lut = _PIXEL_LUT
+        pixels = image._pixels
+        stride = image._width
+        width = min(stride, _WIDTH)
+        for y in range(min(image._height, _HEIGHT)):
+            row = y * stride
+            index = y * _WIDTH
+            for x in range(width):
+                level = pixels[row + x]
+                if level:
+                    fb[lut[index + x]] = _LEVELS[level]
+
+    def _draw(self, buffer, brightness):
+        self._render(buffer, brightness)
+        self._flip()
 
     def _vertical_draw(self, buffer, brightness):
-        self._current_frame = 0 if self._current_frame else 1
-        self.frame(self._current_frame, show=False)
-        self.fill(0)
-        for y in range(self.height):
-            s = ''
-            for i in range(2):
-                col = buffer[2 * y + i]
-                for x in range(8):
-                    bit = 1 << x & col
-                    if bit:
-                        self.pixel(16 - ((8 * i) + x), y, brightness)
-        self.frame(self._current_frame, show=True)
+        fb = self._buffer
+        fb[:] = _BLANK_BUFFER
+        kernels.expand_rows(buffer, _PIXEL_LUT, fb, brightness)
+        self._flip()
+
+    def flush(self, canvas=None):
+        """Shows the canvas, or another buffer in the same layout, on the LED display.
+        Draw on `display.framebuf` first, a GS8 `framebuf.FrameBuffer` whose
+        pixels are the brightness 0->255 of each LED, e.g.
+
+            display.framebuf.fill(0)
+            display.framebuf.rect(0, 0, 17, 7, 30)
+            display.framebuf.text('P', 5, 0, 255)
+            display.flush()
+        """
+        kernels.scatter(self.canvas if canvas is None else canvas, _PIXEL_LUT, self._buffer, _PIXELS)
+        self._flip()
 
     def clear(self):
         """Clears the LED display."""
+        self._stop_autoplay()
         self.fill(0)
+        self._buffer[:] = _BLANK_BUFFER
+        self._buffer_shown = True
+        self._number_columns = None
 
-    def scroll(self, value, brightness=30, fonts=None, fps=15):
-        """Scrolls a number or text on the LED display."""
-        if brightness < 0:
-            brightness = 0
-        if brightness > 255:
-            brightness = 255
+    def _custom_font(self, char, fonts):
+        # 自定义字库中的字模也放进缓存，与自带字库共用容量
+        font = self.glyph_cache.get(char, fonts)
+        if font is None:
+            font = fonts[char]
+            self.glyph_cache.put(char, font, fonts)
+        return font
 
+    def _text_buffer(self, value, fonts=None):
+        # 把文本转换成逐列的位图
         text_buf = bytearray()
-        buf = bytearray(self.width)
-
-        with open(FONTS_BIN, 'rb') as f:
+        f = None  # 只有缓存未命中时才打开字库文件
+        try:
             for char in str(value):
                 if char == " ":
                     text_buf += b"\x00" * 4 # 空格
                 else:
                     font = None
-                    if fonts:   # 优先查找自定义的字库
-                        font = fonts.get(char)
+                    if fonts and char in fonts:   # 优先查找自定义的字库
+                        font = self._custom_font(char, fonts)
                     if not font:   # 从自带字库中查找
-                        font = self._find_font(char, f)
+                        font = self.glyph_cache.get(char)
+                        if font is None:
+                            if f is None:
+                                f = open(FONTS_BIN, 'rb')
+                            font = self._find_font(char, f) or b''
+                            self.glyph_cache.put(char, font)  # 缺字也缓存，避免重复查找
                     if not font:  # 缺字（空白字）
                         font = BLANK_FONT;
-                    text_buf += font + b'\x00' # 字间距 1 列
+                    text_buf += font
+                    text_buf.append(0) # 字间距 1 列
+        finally:
+            if f is not None:
+                f.close()
+        return text_buf
+
+    def render_text(self, value, fonts=None):
+        """Renders a number or text to a `TextStrip` that can be scrolled again and again.
+        The most recently rendered texts are kept, so rendering them again is free.
+        :param value: number or text
+        :param fonts: custom fonts dict, looked up before the built-in fonts
+        """
+        if isinstance(value, TextStrip):
+            return value
+        text = str(value)
+        strips = self._strips
+        strip = strips.pop(text, None)
+        if strip is None or strip.fonts is not fonts:
+            strip = TextStrip(text, self._text_buffer(text, fonts), fonts)
+        strips[text] = strip
+        while len(strips) > STRIP_CACHE_SIZE:
+            strips.pop(next(iter(strips)))
+        return strip
+
+    def _scroll_steps(self, text_buf):
+        # 逐帧生成滚动窗口，每次生成的都是同一个缓冲区
+        buf = bytearray(self.width)
+        for text_index in range(len(text_buf) + self.width):
+            kernels.shift(buf, 1)
+            if text_index < len(text_buf):
+                buf[len(buf) - 1] = text_buf[text_index]
+            else:
+                buf[len(buf) - 1] = 0
+            yield buf
+
+    def scroll(self, value, brightness=30, fonts=None, fps=15, autoplay=False, abort=None):
+        """Scrolls a number, text or `TextStrip` on the LED display.
+        With autoplay=True the frames are played by the chip itself, see `animate`;
+        each frame then lasts 1000 // fps ms, kept within the 11->704 ms of the chip.
+        :param abort: a function checked before each frame, the scroll stops
+            early when it returns True
+        """
+        if brightness < 0:
+            brightness = 0
+        if brightness > 255:
+            brightness = 255
+
+        text_buf = self.render_text(value, fonts).columns
 
         if len(text_buf) <= self.width:
+            buf = bytearray(self.width)
             for buf_index in range(len(text_buf)):
                 buf[buf_index] = text_buf[buf_index]
             self._draw(buf, brightness)
+        elif autoplay:
+            steps = self._autoplay_steps(self._scroll_steps(text_buf), _autoplay_delay(fps), brightness)
+            for idle_time in steps:
+                if abort is not None and abort():
+                    steps.close()
+                    break
+                if idle_time > 0:
+                    utime.sleep_ms(idle_time)
         else:
-            frame_time = 1000 // fps
-            for text_index in range(len(text_buf) + self.width):
-                start = utime.ticks_ms()
-                for buf_index in range(len(buf) - 1):
-                    buf[buf_index] = buf[buf_index + 1]
-                if text_index < len(text_buf):
-                    buf[len(buf) - 1] = text_buf[text_index]
-                self._draw(buf, brightness)
-                # 帧率控制
-                idle_time = frame_time - utime.ticks_diff(utime.ticks_ms(), start)
+            self._draw_steps(self._scroll_steps(text_buf), self._draw, fps, brightness, abort)
+
+    def _paced_steps(self, steps, draw, fps, brightness, abort=None):
+        # 帧率控制：按截止时间逐帧绘制，落后时丢帧以保持滚动速度。
+        # 每画完一帧生成一次 FrameClock，由调用者等到下一帧的截止时间；
+        # abort() 返回 True 时放弃剩下的帧
+        clock = self.frame_clock = FrameClock(fps)
+        drop = 0
+        skipped = None
+        for buf in steps:
+            if abort is not None and abort():
+                return
+            if drop:
+                drop -= 1
+                skipped = buf
+                continue
+            skipped = None
+            draw(buf, brightness)
+            drop = clock.tick()
+            yield clock
+        if skipped is not None:
+            draw(skipped, brightness)  # 最后一帧总要画出来
+
+    def _draw_steps(self, steps, draw, fps, brightness, abort=None):
+        for clock in self._paced_steps(steps, draw, fps, brightness, abort):
+            clock.wait()
+
+    async def scroll_async(self, value, brightness=30, fonts=None, fps=15, autoplay=False):
+        """Asynchronously scrolls a number, text or `TextStrip` on the LED display.
+        Stops early when `stop()` is called or the task is cancelled.
+        """
+        if brightness < 0:
+            brightness = 0
+        if brightness > 255:
+            brightness = 255
+
+        text_buf = self.render_text(value, fonts).columns
+
+        if len(text_buf) <= self.width:
+            buf = bytearray(self.width)
+            for buf_index in range(len(text_buf)):
+                buf[buf_index] = text_buf[buf_index]
+            self._draw(buf, brightness)
+        elif autoplay:
+            await self._autoplay_async(self._scroll_steps(text_buf), _autoplay_delay(fps), brightness)
+        else:
+            await self._draw_async(self._scroll_steps(text_buf), self._draw, fps, brightness)
+
+    def _smooth_steps(self, count, speed, fps):
+        # 逐帧生成滚动位置，单位是 1/256 列
+        step = max(1, speed * 256 // fps)
+        end = (count + self.width) << 8
+        position = 256
+        while position < end:
+            yield position
+            position += step
+        yield end
+
+    def _smooth_draw(self, columns, next_buffer):
+        # 位置落在两列之间时，按小数部分混合相邻两个窗口的亮度
+        def draw(position, brightness):
+            index = position >> 8
+            fraction = position & 0xFF
+            self._render(columns[index:index + _WIDTH], brightness)
+            if fraction:
+                next_buffer[:] = _BLANK_BUFFER
+                kernels.expand_columns(columns[index + 1:index + 1 + _WIDTH], _COLUMN_LUT, next_buffer, _WIDTH, brightness)
+                kernels.blend(self._buffer, next_buffer, _FRAME_BYTES, fraction)
+            self._flip()
+        return draw
+
+    def _smooth_columns(self, value, brightness, fonts):
+        # 文本前后各补一屏空白列，返回列位图，放得下时直接显示并返回 None
+        text_buf = self.render_text(value, fonts).columns
+        if len(text_buf) <= self.width:
+            buf = bytearray(self.width)
+            buf[:len(text_buf)] = text_buf
+            self._draw(buf, brightness)
+            return None
+        blank = bytes(self.width)
+        return memoryview(blank + text_buf + blank)
+
+    def smooth_scroll(self, value, brightness=30, fonts=None, speed=15, fps=30):
+        """Scrolls a number, text or `TextStrip` by fractions of a column.
+        Each frame moves the text speed / fps columns; a position between two
+        columns is shown by blending the brightness of the neighbouring columns,
+        so the motion looks fluid at a lower frame rate than whole-column steps.
+        :param speed: columns per second
+        :param fps: frames per second sent to the display
+        """
+        brightness = min(max(brightness, 0), 255)
+        columns = self._smooth_columns(value, brightness, fonts)
+        if columns is not None:
+            steps = self._smooth_steps(len(columns) - 2 * self.width, speed, fps)
+            self._draw_steps(steps, self._smooth_draw(columns, bytearray(_FRAME_BYTES)), fps, brightness)
+
+    async def smooth_scroll_async(self, value, brightness=30, fonts=None, speed=15, fps=30):
+        """Asynchronously scrolls by fractions of a column, see `smooth_scroll`.
+        Stops early when `stop()` is called or the task is cancelled.
+        """
+        brightness = min(max(brightness, 0), 255)
+        columns = self._smooth_columns(value, brightness, fonts)
+        if columns is not None:
+            steps = self._smooth_steps(len(columns) - 2 * self.width, speed, fps)
+            await self._draw_async(steps, self._smooth_draw(columns, bytearray(_FRAME_BYTES)), fps, brightness)
+
+    async def _draw_async(self, steps, draw, fps, brightness):
+        # 与 _draw_steps 相同，但每帧之间让出控制权，stop() 时提前结束
+        self._playing = True
+        try:
+            for clock in self._paced_steps(steps, draw, fps, brightness, self._not_playing):
+                await clock.wait_async()
+        finally:
+            self._playing = False
+
+    def _not_playing(self):
+        return not self._playing
+
+    async def _autoplay_async(self, frames, delay, brightness):
+        steps = self._autoplay_steps(frames, delay, brightness)
+        self._playing = True
+        try:
+            for idle_time in steps:
+                await uasyncio.sleep_ms(idle_time if idle_time > 0 else 0)
+                if not self._playing:
+                    break
+        finally:
+            steps.close()
+            self._playing = False
+
+    def _load_frames(self, frames, first, count, brightness):
+        # 把 frames 中接下来的最多 count 帧写入从 first 开始的芯片帧，返回实际写入的帧数
+        loaded = 0
+        for frame in range(first, first + count):
+            try:
+                buffer = next(frames)
+            except StopIteration:
+                break
+            if isinstance(buffer, Image):
+                self._render_image(buffer)
+            else:
+                self._render(buffer, brightness)
+            self._write_color(self._output(self._buffer), frame)
+            self._buffer_shown = False
+            self._number_columns = None
+            loaded += 1
+        return loaded
+
+    def _autoplay_steps(self, frames, delay, brightness):
+        # 芯片的 0-3 与 4-7 号帧轮流使用：一半在自动播放时，装填另一半。
+        # 每装填好一批就生成距离本批播放结束的毫秒数，由调用者负责等待。
+        frames = iter(frames)
+        period = delay // 11 * 11  # 自动播放的延时以 11ms 为单位
+        bank = 0
+        last = self._current_frame
+        count = self._load_frames(frames, bank, _AUTOPLAY_BATCH, brightness)
+        try:
+            while count:
+                self.frame(bank, show=False)  # 自动播放从 self._frame 开始
+                self.autoplay(delay, loops=1, frames=count)
+                self._autoplaying = True
+                deadline = utime.ticks_add(utime.ticks_ms(), count * period)
+                last = bank + count - 1
+                # 随时被 stop() 打断时，显示的是正在播放这一批的最后一帧
+                self._current_frame = last
+                bank ^= _AUTOPLAY_BATCH
+                count = self._load_frames(frames, bank, _AUTOPLAY_BATCH, brightness)
+                yield utime.ticks_diff(deadline, utime.ticks_ms())
+        finally:
+            # 停在最后一帧，回到图片模式（中途被关闭时也一样）
+            self._current_frame = last
+            self._stop_autoplay()
+
+    def _stop_autoplay(self):
+        if self._autoplaying:
+            self.autoplay(0)
+            self.frame(self._current_frame)
+            self._autoplaying = False
+
+    def animate(self, frames, delay=66, brightness=30, loops=0):
+        """Plays images using the autoplay engine of the chip.
+        Up to 8 images are loaded into the frames of the chip and the call returns
+        at once, the chip keeps animating until the next show, scroll or clear.
+        Longer sequences are loaded in batches of 4 while the chip plays the
+        previous batch, and the call returns after the last image.
+        :param frames: a list of `Image`, or of bytes with one byte per column
+        :param delay: time of each image in ms, 11->704
+        :param brightness: brightness 0->255 of the column bytes, an `Image`
+            keeps its own levels
+        :param loops: number of loops for up to 8 images, 0 plays forever
+        """
+        _check_delay(delay)
+        if len(frames) > 8:
+            for idle_time in self._autoplay_steps(frames, delay, brightness):
                 if idle_time > 0:
-                    utime.sleep_ms(int(idle_time))
+                    utime.sleep_ms(idle_time)
+            return
+        count = self._load_frames(iter(frames), 0, 8, brightness)
+        if not count:
+            return
+        self.frame(0, show=False)
+        self.autoplay(delay, loops=loops, frames=count % 8)
+        self._autoplaying = True
 
-    def vertical_scroll(self, value, fonts, fps=15, brightness=30):
-        text_buf = bytearray()        
-        buf = bytearray(self.height * 2)
+    async def animate_async(self, frames, delay=66, brightness=30, loops=0):
+        """Asynchronously plays images using the autoplay engine of the chip.
+        Same as `animate`, but longer sequences yield to other tasks while the
+        chip plays each batch. Stops early when `stop()` is called or the task
+        is cancelled.
+        """
+        _check_delay(delay)
+        if len(frames) > 8:
+            await self._autoplay_async(frames, delay, brightness)
+        else:
+            self.animate(frames, delay, brightness, loops)
 
+    def stop(self):
+        """Stops the scrolling or animation.
+        Works for the `*_async` methods and for an animation started by `animate`.
+        """
+        self._playing = False
+        self._stop_autoplay()
+
+    def _vertical_text_buffer(self, value, fonts):
+        # 把文本转换成逐行的位图，每行 2 字节
+        text_buf = bytearray()
         for char in str(value):
             if char == ' ':
                 text_buf += b'\x00' * 8 * 2
             else:
-                font = fonts[char] if char in fonts else b'\x00' * 32
+                font = self._custom_font(char, fonts) if char in fonts else b'\x00' * 32
                 text_buf += font + b'\x00' * 2 * 2 # 间距
+        return text_buf
 
-        frame_time = 1000 // fps
-
+    def _vertical_scroll_steps(self, text_buf):
+        # 逐帧生成纵向滚动窗口，每次生成的都是同一个缓冲区
+        buf = bytearray(self.height * 2)
         for text_index in range(0, len(text_buf) + self.height + 2, 2):
-            start = utime.ticks_ms()
-            for buf_index in range(0, len(buf) - 2, 2):
-                buf[buf_index] = buf[buf_index + 2]
-                buf[buf_index + 1] = buf[buf_index + 3]
+            kernels.shift(buf, 2)
             if text_index < len(text_buf):
                 buf[len(buf) - 2] = text_buf[text_index]
                 buf[len(buf) - 1] = text_buf[text_index + 1]
-            self._vertical_draw(buf, brightness)
-            # 帧率控制
-            idle_time = frame_time - utime.ticks_diff(utime.ticks_ms(), start)
-            if idle_time > 0:
-                utime.sleep_ms(int(idle_time))
+            yield buf
+
+    def vertical_scroll(self, value, fonts, fps=15, brightness=30):
+        text_buf = self._vertical_text_buffer(value, fonts)
+        self._draw_steps(self._vertical_scroll_steps(text_buf), self._vertical_draw, fps, brightness)
+
+    async def vertical_scroll_async(self, value, fonts, fps=15, brightness=30):
+        """Asynchronously scrolls text from bottom to top with custom fonts.
+        Stops early when `stop()` is called or the task is cancelled.
+        """
+        text_buf = self._vertical_text_buffer(value, fonts)
+        await self._draw_async(self._vertical_scroll_steps(text_buf), self._vertical_draw, fps, brightness)
+
+    def _number_glyph(self, char):
+        # 数字的字模（含 1 列字间距）常驻内存；'e'、'inf' 等其他字符每次现画，不缓存
+        glyphs = self._number_glyphs
+        if glyphs is None:
+            glyphs = self._number_glyphs = {}
+            for c in _NUMBER_CHARS:
+                glyphs[c] = bytes(self._text_buffer(c))
+        glyph = glyphs.get(char)
+        if glyph is None:
+            return self._text_buffer(char)
+        return glyph
+
+    def show_number(self, value, align='right', scroll=False, brightness=30):
+        """Shows a number without scrolling, e.g. a counter refreshed several times a second.
+        The digits, sign and decimal point are rendered once and kept in RAM, and
+        when the previous picture is a number only the columns that changed are
+        written to the display, in one small transfer.
+        :param value: int or float
+        :param align: 'left', 'center' or 'right'
+        :param scroll: True to scroll numbers wider than the display, False to cut
+            off the columns that do not fit on the side opposite to align
+        """
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError("show_number needs an int or a float")
+        brightness = min(max(brightness, 0), 255)
+        columns = bytearray()
+        for char in str(value):
+            columns += self._number_glyph(char)
+        columns = columns[:-1]  # 去掉最后的字间距
+        if len(columns) > _WIDTH and scroll:
+            self.scroll(value, brightness)
+            return
+        buf = bytearray(_WIDTH)
+        space = _WIDTH - len(columns)
+        if align == 'left':
+            start = 0
+        elif align == 'center':
+            start = space // 2
+        else:
+            start = space
+        if start < 0:
+            columns = columns[-start:]
+            start = 0
+        columns = columns[:_WIDTH - start]
+        buf[start:start + len(columns)] = columns
+
+        previous = self._number_columns
+        if previous is None or brightness != self._number_brightness:
+            self._draw(buf, brightness)
+            self._number_columns = buf
+            self._number_brightness = brightness
+            return
+        fb = self._buffer
+        changed = False
+        for x in range(_WIDTH):
+            col = buf[x]
+            if col != previous[x]:
+                index = x * _HEIGHT
+                for y in range(_HEIGHT):
+                    fb[_COLUMN_LUT[index + y]] = brightness if col >> y & 1 else 0
+                changed = True
+        if changed:
+            # 直接改写正在显示的帧，只发送变化的列
+            self._write_color(self._output(fb), self._current_frame)
+            self._number_columns = buf
 
     def show(self, value, brightness=30):
         """Shows images, letters or digits on the LED display."""
-        if isinstance(value, (int, float, str)):
+        if isinstance(value, (int, float, str, TextStrip)):
             self.scroll(value, brightness)
 
         elif isinstance(value, bytes):
             self._draw(value, brightness)
+        elif isinstance(value, Image):
+            self._render_image(value)
+            self._flip()
         else:
-            self._current_frame = 0 if self._current_frame else 1
-            self.frame(self._current_frame, show=False)
-            self.fill(0)
+            fb = self._buffer
+            fb[:] = _BLANK_BUFFER
             for pixel in value:
-                self.pixel(pixel[0], pixel[1], int(pixel[2] * 255 / 9))
-            self.frame(self._current_frame, show=True)
+                x, y = pixel[0], pixel[1]
+                if 0 <= x < _WIDTH and 0 <= y < _HEIGHT:
+                    fb[_PIXEL_LUT[y * _WIDTH + x]] = _LEVELS[pixel[2]]
+            self._flip()
+
+
+# 预先算好每个像素的寄存器地址：_PIXEL_LUT 按行排列 (y * 17 + x)，
+# _COLUMN_LUT 按列排列 (x * 7 + y)，每 7 字节就是一列位图的分散表
+_PIXEL_LUT = bytes(Display.pixel_addr(i % _WIDTH, i // _WIDTH) for i in range(_PIXELS))
+_COLUMN_LUT = bytes(Display.pixel_addr(i // _HEIGHT, i % _HEIGHT) for i in range(_PIXELS))
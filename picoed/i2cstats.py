@@ -0,0 +1,87 @@
+"""
+`picoed.i2cstats`
+====================================================
+
+Counts and times the I2C transactions made by the Pico:ed drivers, e.g.
+
+    from machine import I2C, Pin
+    from picoed.display import Display
+    from picoed.i2cstats import I2CStats
+
+    stats = I2CStats(I2C(0, scl=Pin(1), sda=Pin(0)))
+    display = Display(stats)
+    stats.reset()
+    display.scroll('Hello')
+    stats.report()
+
+"""
+
+import utime
+
+
+class I2CStats():
+    """Wraps an I2C bus and keeps the number of transactions, the bytes sent
+    or received (register addresses included) and the time spent in each
+    kind of call. Other attributes are passed through to the bus.
+    """
+
+    def __init__(self, i2c):
+        self.i2c = i2c
+        self.reset()
+
+    def reset(self):
+        """Clears the statistics."""
+        self.transactions = 0
+        self.bytes = 0
+        self.time_us = 0
+        self.calls = {}  # 方法名 -> [次数, 字节数, 微秒]
+
+    def _count(self, name, size, start):
+        elapsed = utime.ticks_diff(utime.ticks_us(), start)
+        self.transactions += 1
+        self.bytes += size
+        self.time_us += elapsed
+        stats = self.calls.get(name)
+        if stats is None:
+            stats = self.calls[name] = [0, 0, 0]
+        stats[0] += 1
+        stats[1] += size
+        stats[2] += elapsed
+
+    def writeto(self, addr, buf, stop=True):
+        start = utime.ticks_us()
+        result = self.i2c.writeto(addr, buf, stop)
+        self._count('writeto', len(buf), start)
+        return result
+
+    def readfrom(self, addr, nbytes, stop=True):
+        start = utime.ticks_us()
+        result = self.i2c.readfrom(addr, nbytes, stop)
+        self._count('readfrom', nbytes, start)
+        return result
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        start = utime.ticks_us()
+        self.i2c.writeto_mem(addr, memaddr, buf, addrsize=addrsize)
+        self._count('writeto_mem', len(buf) + addrsize // 8, start)
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        start = utime.ticks_us()
+        result = self.i2c.readfrom_mem(addr, memaddr, nbytes, addrsize=addrsize)
+        self._count('readfrom_mem', nbytes + addrsize // 8, start)
+        return result
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        start = utime.ticks_us()
+        self.i2c.readfrom_mem_into(addr, memaddr, buf, addrsize=addrsize)
+        self._count('readfrom_mem_into', len(buf) + addrsize // 8, start)
+
+    def __getattr__(self, name):
+        return getattr(self.i2c, name)
+
+    def report(self):
+        """Prints the statistics of each kind of call and the totals."""
+        print('{:<20}{:>8}{:>10}{:>12}'.format('call', 'count', 'bytes', 'us'))
+        for name, stats in self.calls.items():
+            print('{:<20}{:>8}{:>10}{:>12}'.format(name, stats[0], stats[1], stats[2]))
+        print('{:<20}{:>8}{:>10}{:>12}'.format('total', self.transactions, self.bytes, self.time_us))
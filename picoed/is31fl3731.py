@@ -19,6 +19,7 @@ _AUTOPLAY1_REGISTER = const(0x02)
 _AUTOPLAY2_REGISTER = const(0x03)
 _BLINK_REGISTER = const(0x05)
 _AUDIOSYNC_REGISTER = const(0x06)
+_FRAME_STATE_REGISTER = const(0x07)  # read-only, updated by the chip
 _BREATH1_REGISTER = const(0x08)
 _BREATH2_REGISTER = const(0x09)
 _SHUTDOWN_REGISTER = const(0x0A)
@@ -35,6 +36,13 @@ _AUDIOPLAY_MODE = const(0x18)
 _ENABLE_OFFSET = const(0x00)
 _BLINK_OFFSET = const(0x12)
 _COLOR_OFFSET = const(0x24)
+_COLOR_BYTES = const(144)
+_BLINK_BYTES = const(18)
+_CONFIG_BYTES = const(0x0D)  # registers 0x00-0x0C of the config bank
+# config registers always read from the chip: reserved 0x04 and the frame state
+_UNMIRRORED = const(1 << 0x04 | 1 << _FRAME_STATE_REGISTER)
+_PAGE_BYTES = const(0xB4)  # enable, blink and color registers of one frame
+_MERGE_GAP = const(4)  # unchanged bytes cheaper to resend than to start a new transfer
 
 class IS31FL3731:
 
@@ -45,18 +53,44 @@ class IS31FL3731:
         self.i2c = i2c
         self.address = address
         self._frame = None
+        self._selected_bank = None  # last bank written to _BANK_ADDRESS
+        self._config = bytearray(_CONFIG_BYTES)  # write-through copy of the config bank
+        self._pages = [None] * 8  # shadow copy of the registers of each initialized frame
         self._init(frames=frames)
 
     def _bank(self, bank=None):
         if bank is None:
-            return self.i2c.readfrom_mem(self.address, _BANK_ADDRESS, 1)[0]
+            if self._selected_bank is None:
+                self._selected_bank = self.i2c.readfrom_mem(self.address, _BANK_ADDRESS, 1)[0]
+            return self._selected_bank
+        if bank == self._selected_bank:
+            return None
         self.i2c.writeto_mem(self.address, _BANK_ADDRESS, bytearray([bank]))
+        self._selected_bank = bank
+        return None
+
+    def _shadow(self, bank, register):
+        """Returns the RAM copy holding the register, or None if it is not mirrored"""
+        if bank == _CONFIG_BANK:
+            if register < _CONFIG_BYTES and not _UNMIRRORED >> register & 1:
+                return self._config
+            return None
+        if 0 <= bank < 8 and register < _PAGE_BYTES:
+            return self._page(bank)
+        return None
 
     def _register(self, bank, register, value=None):
-        self._bank(bank)
+        shadow = self._shadow(bank, register)
         if value is None:
+            if shadow is not None:
+                return shadow[register]
+            self._bank(bank)
             return self.i2c.readfrom_mem(self.address, register, 1)[0]
+        self._bank(bank)
         self.i2c.writeto_mem(self.address, register, bytearray([value]))
+        if shadow is not None:
+            shadow[register] = value
+        return None
 
     def _mode(self, mode=None):
         return self._register(_CONFIG_BANK, _MODE_REGISTER, mode)
@@ -66,18 +100,37 @@ class IS31FL3731:
         # Clear config; sets to Picture Mode, no audio sync, maintains sleep
         self._bank(_CONFIG_BANK)
         self.i2c.writeto(self.address, bytes([0] * 14))
-        enable_data = bytes([_ENABLE_OFFSET] + [255] * 18)
-        fill_data = bytearray([0] * 25)
-        # Initialize requested frames, or all 8 if unspecified
+        for register in range(_CONFIG_BYTES):
+            self._config[register] = 0
+        # Initialize requested frames, or all 8 if unspecified; the others
+        # are initialized the first time they are used
         for frame in frames if frames else range(8):
-            self._bank(frame)
-            self.i2c.writeto(self.address, enable_data)  # Set all enable bits
-            for row in range(6):  # Barebones quick fill() w/0
-                fill_data[0] = _COLOR_OFFSET + row * 24
-                self.i2c.writeto(self.address, fill_data)
+            self._init_frame(frame)
         self._frame = 0  # To match config bytes above
         self.sleep(False)
 
+    def _init_frame(self, frame):
+        """Sets all enable bits, clears blink and color, and returns the new shadow page"""
+        # Set all enable bits and clear all blink bits, so the shadow page is exact
+        enable_data = bytes([_ENABLE_OFFSET] + [255] * 18 + [0] * 18)
+        fill_data = bytearray([0] * 25)
+        self._bank(frame)
+        self.i2c.writeto(self.address, enable_data)
+        for row in range(6):  # Barebones quick fill() w/0
+            fill_data[0] = _COLOR_OFFSET + row * 24
+            self.i2c.writeto(self.address, fill_data)
+        page = bytearray(_PAGE_BYTES)
+        page[_ENABLE_OFFSET:_COLOR_OFFSET] = enable_data[1:]
+        self._pages[frame] = page
+        return page
+
+    def _page(self, frame):
+        """Returns the shadow page of a frame, initializing the frame on first use"""
+        page = self._pages[frame]
+        if page is None:
+            page = self._init_frame(frame)
+        return page
+
     def reset(self):
         """Kill the display for 10MS"""
         self.sleep(True)
@@ -89,7 +142,7 @@ class IS31FL3731:
         Set the Software Shutdown Register bit
         :param value: True to set software shutdown bit; False unset
         """
-        return self._register(_CONFIG_BANK, _SHUTDOWN_REGISTER, not value)
+        return self._register(_CONFIG_BANK, _SHUTDOWN_REGISTER, int(not value))
 
     def autoplay(self, delay=0, loops=0, frames=0):
         """
@@ -151,6 +204,8 @@ class IS31FL3731:
             raise ValueError("Frame out of range")
         self._frame = frame
         if show:
+            if frame < 8:
+                self._page(frame)
             self._register(_CONFIG_BANK, _FRAME_REGISTER, frame)
         return None
 
@@ -199,6 +254,7 @@ class IS31FL3731:
         """
         if frame is None:
             frame = self._frame
+        page = self._page(frame)
         self._bank(frame)
         if color is not None:
             if not 0 <= color <= 255:
@@ -207,10 +263,88 @@ class IS31FL3731:
             for row in range(6):
                 data[0] = _COLOR_OFFSET + row * 24
                 self.i2c.writeto(self.address, data)
+            for i in range(_COLOR_OFFSET, _PAGE_BYTES):
+                page[i] = color
         if blink is not None:
-            data = bool(blink) * 0xFF
-            for col in range(18):
-                self._register(frame, _BLINK_OFFSET + col, data)
+            self.set_blink_mask(bytes([bool(blink) * 0xFF] * _BLINK_BYTES), frame)
+
+    def set_blink_mask(self, mask, frame=None):
+        """
+        Set the blink bits of all LEDs in one transfer
+        :param mask: 18 bytes, bit n of byte i blinks the LED at pixel_addr i * 8 + n
+        :param frame: which frame to set 0->7
+        """
+        if len(mask) != _BLINK_BYTES:
+            raise ValueError("Blink mask must be 18 bytes")
+        if frame is None:
+            frame = self._frame
+        page = self._page(frame)
+        if page[_BLINK_OFFSET:_COLOR_OFFSET] == mask:
+            return
+        self._bank(frame)
+        self.i2c.writeto_mem(self.address, _BLINK_OFFSET, mask)
+        page[_BLINK_OFFSET:_COLOR_OFFSET] = mask
+
+    def blink_mask(self, frame=None):
+        """Return a copy of the 18-byte blink mask of a frame"""
+        if frame is None:
+            frame = self._frame
+        return bytes(self._page(frame)[_BLINK_OFFSET:_COLOR_OFFSET])
+
+    # pylint: disable-msg=too-many-arguments
+    def blink_region(self, x, y, width, height, blink=True, frame=None):
+        """
+        Turn blinking on or off for a rectangle of pixels, leaving the others as they are
+        :param x: left pixel position
+        :param y: top pixel position
+        :param width: width of the rectangle
+        :param height: height of the rectangle
+        :param blink: True to blink
+        :param frame: which frame to set 0->7
+        """
+        mask = bytearray(self.blink_mask(frame))
+        for row in range(max(y, 0), min(y + height, self.height)):
+            for col in range(max(x, 0), min(x + width, self.width)):
+                addr, bit = divmod(self.pixel_addr(col, row), 8)
+                if blink:
+                    mask[addr] |= 1 << bit
+                else:
+                    mask[addr] &= ~(1 << bit)
+        self.set_blink_mask(mask, frame)
+
+    # pylint: enable-msg=too-many-arguments
+
+    def _write_color(self, buffer, frame=None):
+        """
+        Write a brightness buffer to a frame. Only the runs of registers that differ
+        from the shadow copy of the frame are sent; runs separated by a few unchanged
+        bytes are merged into one auto-increment transfer.
+        :param buffer: 144 bytes, one brightness value per LED in pixel_addr order
+        :param frame: which frame to write 0->7
+        """
+        if frame is None:
+            frame = self._frame
+        page = self._page(frame)
+        view = memoryview(buffer)
+        banked = False
+        i = 0
+        while i < _COLOR_BYTES:
+            if buffer[i] == page[_COLOR_OFFSET + i]:
+                i += 1
+                continue
+            start = end = i
+            i += 1
+            while i < _COLOR_BYTES and i - end <= _MERGE_GAP:
+                if buffer[i] != page[_COLOR_OFFSET + i]:
+                    end = i
+                i += 1
+            end += 1
+            if not banked:
+                self._bank(frame)
+                banked = True
+            self.i2c.writeto_mem(self.address, _COLOR_OFFSET + start, view[start:end])
+            page[_COLOR_OFFSET + start:_COLOR_OFFSET + end] = view[start:end]
+            i = end
 
     # This function must be replaced for each board
     @staticmethod
@@ -234,7 +368,7 @@ class IS31FL3731:
             return None
         pixel = self.pixel_addr(x, y)
         if color is None and blink is None:
-            return self._register(self._frame, pixel)
+            return self._register(self._frame, _COLOR_OFFSET + pixel)
         if frame is None:
             frame = self._frame
         if color is not None:
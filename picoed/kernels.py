@@ -0,0 +1,78 @@
+"""
+`picoed.kernels`
+====================================================
+
+The inner loops of the display rendering. Each kernel has a plain Python
+version; on ports with the viper code emitter the compiled versions from
+`picoed._kernels_viper` are used instead. `viper` is that module, or None
+when it is not available (e.g. on a host CPython).
+
+"""
+
+
+def expand_columns_py(columns, lut, out, count, value):
+    """Sets out[lut[x * 7 + y]] = value for each bit y of the first count columns."""
+    index = 0
+    for x in range(count):
+        col = columns[x] & 0x7F  # 只有 7 行
+        while col:  # 只处理亮的像素
+            if col & 1:
+                out[lut[index]] = value
+            col >>= 1
+            index += 1
+        index = (x + 1) * 7
+
+
+def expand_rows_py(rows, lut, out, value):
+    """Sets the pixels of 7 rows of 2 bytes, bit x of byte i lights column 16 - 8 * i - x."""
+    for y in range(7):
+        for i in range(2):
+            col = rows[2 * y + i]
+            index = y * 17 + 16 - 8 * i
+            for x in range(8):
+                if col >> x & 1:
+                    out[lut[index - x]] = value
+
+
+def scatter_py(src, lut, out, count):
+    """Sets out[lut[i]] = src[i] for the first count bytes of src."""
+    for index in range(count):
+        out[lut[index]] = src[index]
+
+
+def translate_py(src, table, out, count):
+    """Sets out[i] = table[src[i]] for the first count bytes of src."""
+    for index in range(count):
+        out[index] = table[src[index]]
+
+
+def shift_py(buf, step):
+    """Moves the bytes of buf step places to the left, the last step bytes are kept."""
+    for index in range(len(buf) - step):
+        buf[index] = buf[index + step]
+
+
+def blend_py(dst, src, count, alpha):
+    """Mixes src into dst: dst = (dst * (256 - alpha) + src * alpha) >> 8, alpha 0->256."""
+    keep = 256 - alpha
+    for index in range(count):
+        dst[index] = (dst[index] * keep + src[index] * alpha) >> 8
+
+
+expand_columns = expand_columns_py
+expand_rows = expand_rows_py
+scatter = scatter_py
+translate = translate_py
+shift = shift_py
+blend = blend_py
+
+try:
+    from . import _kernels_viper as viper
+    expand_columns = viper.expand_columns
+    expand_rows = viper.expand_rows
+    scatter = viper.scatter
+    translate = viper.translate
+    shift = viper.shift
+    blend = viper.blend
+except Exception:  # 没有 viper 的固件或主机上的 CPython
+    viper = None
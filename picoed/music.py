@@ -11,10 +11,14 @@ in MicroPython. The library was inspired by the micro:bit `music` module.
 
 import utime
 import uasyncio
-from machine import PWM
+from array import array
+import micropython
+from machine import PWM, Timer
 from micropython import const
 
 _ARTICULATION_MS = const(10)  # articulation between notes in milliseconds
+_CHUNK_BYTES = const(32)  # melody files are read in chunks of this size
+MELODY_MAGIC = b'PMEL'  # header of the binary melody format
 _MIDDLE_FREQUENCIES = [
     const(440),
     const(494),
@@ -35,100 +39,374 @@ _MIDDLE_SHARPS_FREQUENCIES = [
 ]
 
 
+def _compile_note(note_str, state):
+    """Parses a note like "c#4:8" and returns its frequency.
+    state is [octave, duration] of the previous note, updated in place.
+    """
+    note_split = note_str.lower().split(":")
+    note = 'r'
+    sharp = False
+    note_index = 0
+
+    if len(note_split) > 0:
+        note = note_split[0]
+    if len(note_split) > 1:
+        try:
+            state[1] = int(note_split[1])
+        except ValueError as error:
+            raise ValueError(
+                f"note '{note_str}' format is incorrect."
+            ) from error
+
+    # note(a, b, c, d, e, f, g, r), note_index(0, 1, 2, 3, 4, 5, 6, 17)
+    note_index = ord(note[0]) - ord("a")
+    if note_index < 0 or (note_index > 6 and note_index != 17):
+        raise ValueError(f"note '{note_str}' format is incorrect.")
+
+    # Like "c4", "c#" or "db"
+    if len(note) == 2:
+        try:
+            # Like "c4"
+            state[0] = int(note[1])
+        except ValueError as error:
+            # Like "c#" or "db"
+            sharp = True
+            if note[1] == "b" and note_index <= 6:
+                note_index -= 1
+            elif note[1] != "#":
+                raise ValueError(
+                    f"note '{note_str}' format is incorrect."
+                ) from error
+    # Like "c#4"
+    elif len(note) == 3:
+        try:
+            state[0] = int(note[2])
+        except ValueError as error:
+            raise ValueError(
+                f"note '{note_str}' format is incorrect."
+            ) from error
+
+        sharp = True
+        if note[1] == "b" and note_index <= 6:
+            note_index -= 1
+        elif note[1] != "#":
+            raise ValueError(f"note '{note_str}' format is incorrect.")
+    elif len(note) != 1:
+        raise ValueError(f"note '{note_str}' format is incorrect.")
+
+    return _frequency(note_index, sharp, state[0])
+
+
+def _frequency(note_index, sharp, octave):
+    """Returns the frequency of note a->g (0->6) in octave, 0 for a rest."""
+    frequency = 0
+    if note_index <= 6:
+        shift_count = octave - 4
+        if sharp:
+            if shift_count > 0:
+                frequency = _MIDDLE_SHARPS_FREQUENCIES[note_index] \
+                    << shift_count
+            else:
+                frequency = _MIDDLE_SHARPS_FREQUENCIES[note_index] \
+                    >> -shift_count
+        else:
+            if shift_count > 0:
+                frequency = _MIDDLE_FREQUENCIES[note_index] << shift_count
+            else:
+                frequency = _MIDDLE_FREQUENCIES[note_index] >> -shift_count
+
+    return frequency
+
+
+def _note_name(frequency):
+    """Returns a note like "c#4" with the frequency, or "r" for a rest."""
+    if frequency:
+        for octave in range(9):
+            for note_index in range(7):
+                for sharp in (False, True):
+                    if _frequency(note_index, sharp, octave) == frequency:
+                        return chr(ord('a') + note_index) + ('#' if sharp else '') + str(octave)
+    return 'r'
+
+
+def _rtttl_tokens(f):
+    """Yields (token, separator) from an RTTTL file, read in small chunks."""
+    buf = bytearray(_CHUNK_BYTES)
+    token = ''
+    while True:
+        count = f.readinto(buf)
+        if not count:
+            break
+        for index in range(count):
+            code = buf[index]
+            if code == 0x2C or code == 0x3A:  # ',' ':'
+                yield token, code
+                token = ''
+            elif code > 0x20:
+                token += chr(code)
+    if token:
+        yield token, 0
+
+
+def _rtttl_notes(f):
+    """Yields frequency, duration in ms, frequency, ... from an RTTTL file,
+    like "name:d=4,o=5,b=120:8c,8d#6,4p,2g.".
+    """
+    tokens = _rtttl_tokens(f)
+    for _, separator in tokens:  # 跳过曲名
+        if separator == 0x3A:
+            break
+    duration, octave, bpm = 4, 6, 63  # RTTTL 的默认值
+    for token, separator in tokens:  # 默认设置，如 d=4
+        if '=' in token:
+            key, value = token.lower().split('=')
+            if key == 'd':
+                duration = int(value)
+            elif key == 'o':
+                octave = int(value)
+            elif key == 'b':
+                bpm = int(value)
+        if separator == 0x3A:
+            break
+    whole = 240000 // bpm  # 全音符的毫秒数
+    for token, _ in tokens:
+        note = token.lower()
+        index = 0
+        while index < len(note) and '0' <= note[index] <= '9':
+            index += 1
+        note_duration = int(note[:index]) if index else duration
+        if index >= len(note):
+            raise ValueError(f"note '{token}' format is incorrect.")
+        letter = note[index]
+        index += 1
+        if letter == 'p':
+            note_index = 17
+        elif letter == 'h':
+            note_index = 1  # 德式写法，h 即 b
+        elif 'a' <= letter <= 'g':
+            note_index = ord(letter) - ord('a')
+        else:
+            raise ValueError(f"note '{token}' format is incorrect.")
+        sharp = index < len(note) and note[index] == '#'
+        if sharp:
+            index += 1
+        dotted = False
+        note_octave = octave
+        for char in note[index:]:
+            if char == '.':
+                dotted = True
+            elif '0' <= char <= '9':
+                note_octave = ord(char) - ord('0')
+            else:
+                raise ValueError(f"note '{token}' format is incorrect.")
+        ms = whole // note_duration
+        if dotted:
+            ms += ms >> 1
+        yield _frequency(note_index, sharp, note_octave)
+        yield ms
+
+
 class Music:
 
-    DADADADUM = ["r4:2", "g", "g", "g", "eb:8", "r:2", "f", "f", "f", "d:8"]
-    ENTERTAINER = [
-        "d4:1", "d#", "e", "c5:2", "e4:1", "c5:2", "e4:1", "c5:3",
-        "c:1", "d", "d#", "e", "c", "d", "e:2", "b4:1", "d5:2", "c:4"
-    ]
-    PRELUDE = [
-        "c4:1", "e", "g", "c5", "e", "g4", "c5", "e", "c4", "e", "g", "c5",
-        "e", "g4", "c5", "e", "c4", "d", "g", "d5", "f", "g4", "d5", "f",
-        "c4", "d", "g", "d5", "f", "g4", "d5", "f", "b3", "d4", "g", "d5",
-        "f", "g4", "d5", "f", "b3", "d4", "g", "d5", "f", "g4", "d5", "f",
-        "c4", "e", "g", "c5", "e", "g4", "c5", "e", "c4", "e", "g", "c5",
-        "e", "g4", "c5", "e"
-    ]
-    ODE = [
-        "e4", "e", "f", "g", "g", "f", "e", "d", "c", "c", "d", "e",
-        "e:6", "d:2", "d:8", "e:4", "e", "f", "g", "g", "f", "e",
-        "d", "c", "c", "d", "e", "d:6", "c:2", "c:8"
-    ]
-    NYAN = [
-        "f#5:2", "g#", "c#:1", "d#:2", "b4:1", "d5:1", "c#", "b4:2", "b",
-        "c#5", "d", "d:1", "c#", "b4:1", "c#5:1", "d#", "f#", "g#", "d#",
-        "f#", "c#", "d", "b4", "c#5", "b4", "d#5:2", "f#", "g#:1", "d#",
-        "f#", "c#", "d#", "b4", "d5", "d#", "d", "c#", "b4", "c#5", "d:2",
-        "b4:1", "c#5", "d#", "f#", "c#", "d", "c#", "b4", "c#5:2", "b4",
-        "c#5", "b4", "f#:1", "g#", "b:2", "f#:1", "g#", "b", "c#5", "d#",
-        "b4", "e5", "d#", "e", "f#", "b4:2", "b", "f#:1", "g#", "b", "f#",
-        "e5", "d#", "c#", "b4", "f#", "d#", "e", "f#", "b:2", "f#:1", "g#",
-        "b:2", "f#:1", "g#", "b", "b", "c#5", "d#", "b4", "f#", "g#", "f#",
-        "b:2", "b:1", "a#", "b", "f#", "g#", "b", "e5", "d#", "e", "f#",
-        "b4:2", "c#5"
-    ]
-    RINGTONE = [
-        "c4:1", "d", "e:2", "g", "d:1", "e", "f:2", "a", "e:1", "f", "g:2",
-        "b", "c5:4"
-    ]
-    FUNK = [
-        "c2:2", "c", "d#", "c:1", "f:2", "c:1", "f:2", "f#", "g", "c", "c",
-        "g", "c:1", "f#:2", "c:1", "f#:2", "f", "d#"
-    ]
-    BLUES = [
-        "c2:2", "e", "g", "a", "a#", "a", "g", "e", "c2:2", "e", "g", "a",
-        "a#", "a", "g", "e", "f", "a", "c3", "d", "d#", "d", "c", "a2",
-        "c2:2", "e", "g", "a", "a#", "a", "g", "e", "g", "b", "d3", "f",
-        "f2", "a", "c3", "d#", "c2:2", "e", "g", "e", "g", "f", "e", "d"
-    ]
-    BIRTHDAY = [
-        "c4:3", "c:1", "d:4", "c:4", "f", "e:8", "c:3", "c:1", "d:4", "c:4",
-        "g", "f:8", "c:3", "c:1", "c5:4", "a4", "f", "e", "d", "a#:3", "a#:1",
-        "a:4", "f", "g", "f:8"
-    ]
-    WEDDING = [
-        "c4:4", "f:3", "f:1", "f:8", "c:4", "g:3", "e:1", "f:8", "c:4", "f:3",
-        "a:1", "c5:4", "a4:3", "f:1", "f:4", "e:3", "f:1", "g:8"
-    ]
-    FUNERAL = [
-        "c3:4", "c:3", "c:1", "c:4", "d#:3", "d:1", "d:3", "c:1", "c:3",
-        "b2:1", "c3:4"
-    ]
-    PUNCHLINE = [
-        "c4:3", "g3:1", "f#", "g", "g#:3", "g", "r", "b", "c4"
-    ]
-    PYTHON = [
-        "d5:1", "b4", "r", "b", "b", "a#", "b", "g5", "r", "d", "d", "r",
-        "b4", "c5", "r", "c", "c", "r", "d", "e:5", "c:1", "a4", "r",
-        "a", "a", "g#", "a", "f#5", "r", "e", "e", "r", "c", "b4", "r",
-        "b", "b", "r", "c5", "d:5", "d:1", "b4", "r", "b", "b", "a#",
-        "b", "b5", "r", "g", "g", "r", "d", "c#", "r", "a", "a", "r",
-        "a", "a:5", "g:1", "f#:2", "a:1", "a", "g#", "a", "e:2", "a:1",
-        "a", "g#", "a", "d", "r", "c#", "d", "r", "c#", "d:2", "r:3"
-    ]
-    BADDY = ["c3:3", "r", "d:2", "d#", "r", "c", "r", "f#:8"]
-    CHASE = [
-        "a4:1", "b", "c5", "b4", "a:2", "r", "a:1", "b", "c5", "b4",
-        "a:2", "r", "a:2", "e5", "d#", "e", "f", "e", "d#", "e", "b4:1",
-        "c5", "d", "c", "b4:2", "r", "b:1", "c5", "d", "c", "b4:2", "r",
-        "b:2", "e5", "d#", "e", "f", "e", "d#", "e",
-    ]
-    BA_DING = ["b5:1", "e6:3"]
-    WAWAWAWAA = ["e3:3", "r:1", "d#:3", "r:1", "d:4", "r:1", "c#:8"]
-    JUMP_UP = ["c5:1", "d", "e", "f", "g"]
-    JUMP_DOWN = ["g5:1", "f", "e", "d", "c"]
-    POWER_UP = ["g4:1", "c5", "e", "g:2", "e:1", "g:3"]
-    POWER_DOWN = ["g5:1", "d#", "c", "g4:2", "b:1", "c5:3"]
+    # 内置曲目以编译后的形式保存，每个音符 4 字节，由 tools/melodies.py 生成；
+    # 需要音符写法时用 Music.notes(name)
+    DADADADUM = (
+        b'\x00\x00\x02\x00\x88\x01\x02\x00\x88\x01\x02\x00\x88\x01\x02\x00'
+        b'\x37\x01\x08\x00\x00\x00\x02\x00\x5d\x01\x02\x00\x5d\x01\x02\x00'
+        b'\x5d\x01\x02\x00\x26\x01\x08\x00'
+    )
+    ENTERTAINER = (
+        b'\x26\x01\x01\x00\x37\x01\x01\x00\x4a\x01\x01\x00\x0c\x02\x02\x00'
+        b'\x4a\x01\x01\x00\x0c\x02\x02\x00\x4a\x01\x01\x00\x0c\x02\x03\x00'
+        b'\x0c\x02\x01\x00\x4c\x02\x01\x00\x6e\x02\x01\x00\x94\x02\x01\x00'
+        b'\x0c\x02\x01\x00\x4c\x02\x01\x00\x94\x02\x02\x00\xee\x01\x01\x00'
+        b'\x4c\x02\x02\x00\x0c\x02\x04\x00'
+    )
+    PRELUDE = (
+        b'\x06\x01\x01\x00\x4a\x01\x01\x00\x88\x01\x01\x00\x0c\x02\x01\x00'
+        b'\x94\x02\x01\x00\x88\x01\x01\x00\x0c\x02\x01\x00\x94\x02\x01\x00'
+        b'\x06\x01\x01\x00\x4a\x01\x01\x00\x88\x01\x01\x00\x0c\x02\x01\x00'
+        b'\x94\x02\x01\x00\x88\x01\x01\x00\x0c\x02\x01\x00\x94\x02\x01\x00'
+        b'\x06\x01\x01\x00\x26\x01\x01\x00\x88\x01\x01\x00\x4c\x02\x01\x00'
+        b'\xba\x02\x01\x00\x88\x01\x01\x00\x4c\x02\x01\x00\xba\x02\x01\x00'
+        b'\x06\x01\x01\x00\x26\x01\x01\x00\x88\x01\x01\x00\x4c\x02\x01\x00'
+        b'\xba\x02\x01\x00\x88\x01\x01\x00\x4c\x02\x01\x00\xba\x02\x01\x00'
+        b'\xf7\x00\x01\x00\x26\x01\x01\x00\x88\x01\x01\x00\x4c\x02\x01\x00'
+        b'\xba\x02\x01\x00\x88\x01\x01\x00\x4c\x02\x01\x00\xba\x02\x01\x00'
+        b'\xf7\x00\x01\x00\x26\x01\x01\x00\x88\x01\x01\x00\x4c\x02\x01\x00'
+        b'\xba\x02\x01\x00\x88\x01\x01\x00\x4c\x02\x01\x00\xba\x02\x01\x00'
+        b'\x06\x01\x01\x00\x4a\x01\x01\x00\x88\x01\x01\x00\x0c\x02\x01\x00'
+        b'\x94\x02\x01\x00\x88\x01\x01\x00\x0c\x02\x01\x00\x94\x02\x01\x00'
+        b'\x06\x01\x01\x00\x4a\x01\x01\x00\x88\x01\x01\x00\x0c\x02\x01\x00'
+        b'\x94\x02\x01\x00\x88\x01\x01\x00\x0c\x02\x01\x00\x94\x02\x01\x00'
+    )
+    ODE = (
+        b'\x4a\x01\x04\x00\x4a\x01\x04\x00\x5d\x01\x04\x00\x88\x01\x04\x00'
+        b'\x88\x01\x04\x00\x5d\x01\x04\x00\x4a\x01\x04\x00\x26\x01\x04\x00'
+        b'\x06\x01\x04\x00\x06\x01\x04\x00\x26\x01\x04\x00\x4a\x01\x04\x00'
+        b'\x4a\x01\x06\x00\x26\x01\x02\x00\x26\x01\x08\x00\x4a\x01\x04\x00'
+        b'\x4a\x01\x04\x00\x5d\x01\x04\x00\x88\x01\x04\x00\x88\x01\x04\x00'
+        b'\x5d\x01\x04\x00\x4a\x01\x04\x00\x26\x01\x04\x00\x06\x01\x04\x00'
+        b'\x06\x01\x04\x00\x26\x01\x04\x00\x4a\x01\x04\x00\x26\x01\x06\x00'
+        b'\x06\x01\x02\x00\x06\x01\x08\x00'
+    )
+    NYAN = (
+        b'\xe4\x02\x02\x00\x3e\x03\x02\x00\x2a\x02\x01\x00\x6e\x02\x02\x00'
+        b'\xee\x01\x01\x00\x4c\x02\x01\x00\x2a\x02\x01\x00\xee\x01\x02\x00'
+        b'\xee\x01\x02\x00\x2a\x02\x02\x00\x4c\x02\x02\x00\x4c\x02\x01\x00'
+        b'\x2a\x02\x01\x00\xee\x01\x01\x00\x2a\x02\x01\x00\x6e\x02\x01\x00'
+        b'\xe4\x02\x01\x00\x3e\x03\x01\x00\x6e\x02\x01\x00\xe4\x02\x01\x00'
+        b'\x2a\x02\x01\x00\x4c\x02\x01\x00\xee\x01\x01\x00\x2a\x02\x01\x00'
+        b'\xee\x01\x01\x00\x6e\x02\x02\x00\xe4\x02\x02\x00\x3e\x03\x01\x00'
+        b'\x6e\x02\x01\x00\xe4\x02\x01\x00\x2a\x02\x01\x00\x6e\x02\x01\x00'
+        b'\xee\x01\x01\x00\x4c\x02\x01\x00\x6e\x02\x01\x00\x4c\x02\x01\x00'
+        b'\x2a\x02\x01\x00\xee\x01\x01\x00\x2a\x02\x01\x00\x4c\x02\x02\x00'
+        b'\xee\x01\x01\x00\x2a\x02\x01\x00\x6e\x02\x01\x00\xe4\x02\x01\x00'
+        b'\x2a\x02\x01\x00\x4c\x02\x01\x00\x2a\x02\x01\x00\xee\x01\x01\x00'
+        b'\x2a\x02\x02\x00\xee\x01\x02\x00\x2a\x02\x02\x00\xee\x01\x02\x00'
+        b'\x72\x01\x01\x00\x9f\x01\x01\x00\xee\x01\x02\x00\x72\x01\x01\x00'
+        b'\x9f\x01\x01\x00\xee\x01\x01\x00\x2a\x02\x01\x00\x6e\x02\x01\x00'
+        b'\xee\x01\x01\x00\x94\x02\x01\x00\x6e\x02\x01\x00\x94\x02\x01\x00'
+        b'\xe4\x02\x01\x00\xee\x01\x02\x00\xee\x01\x02\x00\x72\x01\x01\x00'
+        b'\x9f\x01\x01\x00\xee\x01\x01\x00\x72\x01\x01\x00\x94\x02\x01\x00'
+        b'\x6e\x02\x01\x00\x2a\x02\x01\x00\xee\x01\x01\x00\x72\x01\x01\x00'
+        b'\x37\x01\x01\x00\x4a\x01\x01\x00\x72\x01\x01\x00\xee\x01\x02\x00'
+        b'\x72\x01\x01\x00\x9f\x01\x01\x00\xee\x01\x02\x00\x72\x01\x01\x00'
+        b'\x9f\x01\x01\x00\xee\x01\x01\x00\xee\x01\x01\x00\x2a\x02\x01\x00'
+        b'\x6e\x02\x01\x00\xee\x01\x01\x00\x72\x01\x01\x00\x9f\x01\x01\x00'
+        b'\x72\x01\x01\x00\xee\x01\x02\x00\xee\x01\x01\x00\xd2\x01\x01\x00'
+        b'\xee\x01\x01\x00\x72\x01\x01\x00\x9f\x01\x01\x00\xee\x01\x01\x00'
+        b'\x94\x02\x01\x00\x6e\x02\x01\x00\x94\x02\x01\x00\xe4\x02\x01\x00'
+        b'\xee\x01\x02\x00\x2a\x02\x02\x00'
+    )
+    RINGTONE = (
+        b'\x06\x01\x01\x00\x26\x01\x01\x00\x4a\x01\x02\x00\x88\x01\x02\x00'
+        b'\x26\x01\x01\x00\x4a\x01\x01\x00\x5d\x01\x02\x00\xb8\x01\x02\x00'
+        b'\x4a\x01\x01\x00\x5d\x01\x01\x00\x88\x01\x02\x00\xee\x01\x02\x00'
+        b'\x0c\x02\x04\x00'
+    )
+    FUNK = (
+        b'\x41\x00\x02\x00\x41\x00\x02\x00\x4d\x00\x02\x00\x41\x00\x01\x00'
+        b'\x57\x00\x02\x00\x41\x00\x01\x00\x57\x00\x02\x00\x5c\x00\x02\x00'
+        b'\x62\x00\x02\x00\x41\x00\x02\x00\x41\x00\x02\x00\x62\x00\x02\x00'
+        b'\x41\x00\x01\x00\x5c\x00\x02\x00\x41\x00\x01\x00\x5c\x00\x02\x00'
+        b'\x57\x00\x02\x00\x4d\x00\x02\x00'
+    )
+    BLUES = (
+        b'\x41\x00\x02\x00\x52\x00\x02\x00\x62\x00\x02\x00\x6e\x00\x02\x00'
+        b'\x74\x00\x02\x00\x6e\x00\x02\x00\x62\x00\x02\x00\x52\x00\x02\x00'
+        b'\x41\x00\x02\x00\x52\x00\x02\x00\x62\x00\x02\x00\x6e\x00\x02\x00'
+        b'\x74\x00\x02\x00\x6e\x00\x02\x00\x62\x00\x02\x00\x52\x00\x02\x00'
+        b'\x57\x00\x02\x00\x6e\x00\x02\x00\x83\x00\x02\x00\x93\x00\x02\x00'
+        b'\x9b\x00\x02\x00\x93\x00\x02\x00\x83\x00\x02\x00\x6e\x00\x02\x00'
+        b'\x41\x00\x02\x00\x52\x00\x02\x00\x62\x00\x02\x00\x6e\x00\x02\x00'
+        b'\x74\x00\x02\x00\x6e\x00\x02\x00\x62\x00\x02\x00\x52\x00\x02\x00'
+        b'\x62\x00\x02\x00\x7b\x00\x02\x00\x93\x00\x02\x00\xae\x00\x02\x00'
+        b'\x57\x00\x02\x00\x6e\x00\x02\x00\x83\x00\x02\x00\x9b\x00\x02\x00'
+        b'\x41\x00\x02\x00\x52\x00\x02\x00\x62\x00\x02\x00\x52\x00\x02\x00'
+        b'\x62\x00\x02\x00\x57\x00\x02\x00\x52\x00\x02\x00\x49\x00\x02\x00'
+    )
+    BIRTHDAY = (
+        b'\x06\x01\x03\x00\x06\x01\x01\x00\x26\x01\x04\x00\x06\x01\x04\x00'
+        b'\x5d\x01\x04\x00\x4a\x01\x08\x00\x06\x01\x03\x00\x06\x01\x01\x00'
+        b'\x26\x01\x04\x00\x06\x01\x04\x00\x88\x01\x04\x00\x5d\x01\x08\x00'
+        b'\x06\x01\x03\x00\x06\x01\x01\x00\x0c\x02\x04\x00\xb8\x01\x04\x00'
+        b'\x5d\x01\x04\x00\x4a\x01\x04\x00\x26\x01\x04\x00\xd2\x01\x03\x00'
+        b'\xd2\x01\x01\x00\xb8\x01\x04\x00\x5d\x01\x04\x00\x88\x01\x04\x00'
+        b'\x5d\x01\x08\x00'
+    )
+    WEDDING = (
+        b'\x06\x01\x04\x00\x5d\x01\x03\x00\x5d\x01\x01\x00\x5d\x01\x08\x00'
+        b'\x06\x01\x04\x00\x88\x01\x03\x00\x4a\x01\x01\x00\x5d\x01\x08\x00'
+        b'\x06\x01\x04\x00\x5d\x01\x03\x00\xb8\x01\x01\x00\x0c\x02\x04\x00'
+        b'\xb8\x01\x03\x00\x5d\x01\x01\x00\x5d\x01\x04\x00\x4a\x01\x03\x00'
+        b'\x5d\x01\x01\x00\x88\x01\x08\x00'
+    )
+    FUNERAL = (
+        b'\x83\x00\x04\x00\x83\x00\x03\x00\x83\x00\x01\x00\x83\x00\x04\x00'
+        b'\x9b\x00\x03\x00\x93\x00\x01\x00\x93\x00\x03\x00\x83\x00\x01\x00'
+        b'\x83\x00\x03\x00\x7b\x00\x01\x00\x83\x00\x04\x00'
+    )
+    PUNCHLINE = (
+        b'\x06\x01\x03\x00\xc4\x00\x01\x00\xb9\x00\x01\x00\xc4\x00\x01\x00'
+        b'\xcf\x00\x03\x00\xc4\x00\x03\x00\x00\x00\x03\x00\xf7\x00\x03\x00'
+        b'\x06\x01\x03\x00'
+    )
+    PYTHON = (
+        b'\x4c\x02\x01\x00\xee\x01\x01\x00\x00\x00\x01\x00\xee\x01\x01\x00'
+        b'\xee\x01\x01\x00\xd2\x01\x01\x00\xee\x01\x01\x00\x10\x03\x01\x00'
+        b'\x00\x00\x01\x00\x4c\x02\x01\x00\x4c\x02\x01\x00\x00\x00\x01\x00'
+        b'\xee\x01\x01\x00\x0c\x02\x01\x00\x00\x00\x01\x00\x0c\x02\x01\x00'
+        b'\x0c\x02\x01\x00\x00\x00\x01\x00\x4c\x02\x01\x00\x94\x02\x05\x00'
+        b'\x0c\x02\x01\x00\xb8\x01\x01\x00\x00\x00\x01\x00\xb8\x01\x01\x00'
+        b'\xb8\x01\x01\x00\x9f\x01\x01\x00\xb8\x01\x01\x00\xe4\x02\x01\x00'
+        b'\x00\x00\x01\x00\x94\x02\x01\x00\x94\x02\x01\x00\x00\x00\x01\x00'
+        b'\x0c\x02\x01\x00\xee\x01\x01\x00\x00\x00\x01\x00\xee\x01\x01\x00'
+        b'\xee\x01\x01\x00\x00\x00\x01\x00\x0c\x02\x01\x00\x4c\x02\x05\x00'
+        b'\x4c\x02\x01\x00\xee\x01\x01\x00\x00\x00\x01\x00\xee\x01\x01\x00'
+        b'\xee\x01\x01\x00\xd2\x01\x01\x00\xee\x01\x01\x00\xdc\x03\x01\x00'
+        b'\x00\x00\x01\x00\x10\x03\x01\x00\x10\x03\x01\x00\x00\x00\x01\x00'
+        b'\x4c\x02\x01\x00\x2a\x02\x01\x00\x00\x00\x01\x00\x70\x03\x01\x00'
+        b'\x70\x03\x01\x00\x00\x00\x01\x00\x70\x03\x01\x00\x70\x03\x05\x00'
+        b'\x10\x03\x01\x00\xe4\x02\x02\x00\x70\x03\x01\x00\x70\x03\x01\x00'
+        b'\x3e\x03\x01\x00\x70\x03\x01\x00\x94\x02\x02\x00\x70\x03\x01\x00'
+        b'\x70\x03\x01\x00\x3e\x03\x01\x00\x70\x03\x01\x00\x4c\x02\x01\x00'
+        b'\x00\x00\x01\x00\x2a\x02\x01\x00\x4c\x02\x01\x00\x00\x00\x01\x00'
+        b'\x2a\x02\x01\x00\x4c\x02\x02\x00\x00\x00\x03\x00'
+    )
+    BADDY = (
+        b'\x83\x00\x03\x00\x00\x00\x03\x00\x93\x00\x02\x00\x9b\x00\x02\x00'
+        b'\x00\x00\x02\x00\x83\x00\x02\x00\x00\x00\x02\x00\xb9\x00\x08\x00'
+    )
+    CHASE = (
+        b'\xb8\x01\x01\x00\xee\x01\x01\x00\x0c\x02\x01\x00\xee\x01\x01\x00'
+        b'\xb8\x01\x02\x00\x00\x00\x02\x00\xb8\x01\x01\x00\xee\x01\x01\x00'
+        b'\x0c\x02\x01\x00\xee\x01\x01\x00\xb8\x01\x02\x00\x00\x00\x02\x00'
+        b'\xb8\x01\x02\x00\x94\x02\x02\x00\x6e\x02\x02\x00\x94\x02\x02\x00'
+        b'\xba\x02\x02\x00\x94\x02\x02\x00\x6e\x02\x02\x00\x94\x02\x02\x00'
+        b'\xee\x01\x01\x00\x0c\x02\x01\x00\x4c\x02\x01\x00\x0c\x02\x01\x00'
+        b'\xee\x01\x02\x00\x00\x00\x02\x00\xee\x01\x01\x00\x0c\x02\x01\x00'
+        b'\x4c\x02\x01\x00\x0c\x02\x01\x00\xee\x01\x02\x00\x00\x00\x02\x00'
+        b'\xee\x01\x02\x00\x94\x02\x02\x00\x6e\x02\x02\x00\x94\x02\x02\x00'
+        b'\xba\x02\x02\x00\x94\x02\x02\x00\x6e\x02\x02\x00\x94\x02\x02\x00'
+    )
+    BA_DING = (
+        b'\xdc\x03\x01\x00\x28\x05\x03\x00'
+    )
+    WAWAWAWAA = (
+        b'\xa5\x00\x03\x00\x00\x00\x01\x00\x9b\x00\x03\x00\x00\x00\x01\x00'
+        b'\x93\x00\x04\x00\x00\x00\x01\x00\x8a\x00\x08\x00'
+    )
+    JUMP_UP = (
+        b'\x0c\x02\x01\x00\x4c\x02\x01\x00\x94\x02\x01\x00\xba\x02\x01\x00'
+        b'\x10\x03\x01\x00'
+    )
+    JUMP_DOWN = (
+        b'\x10\x03\x01\x00\xba\x02\x01\x00\x94\x02\x01\x00\x4c\x02\x01\x00'
+        b'\x0c\x02\x01\x00'
+    )
+    POWER_UP = (
+        b'\x88\x01\x01\x00\x0c\x02\x01\x00\x94\x02\x01\x00\x10\x03\x02\x00'
+        b'\x94\x02\x01\x00\x10\x03\x03\x00'
+    )
+    POWER_DOWN = (
+        b'\x10\x03\x01\x00\x6e\x02\x01\x00\x0c\x02\x01\x00\x88\x01\x02\x00'
+        b'\xee\x01\x01\x00\x0c\x02\x03\x00'
+    )
 
     def __init__(self, pin, ticks=4, bpm=120):
         self._ticks = ticks
         self._bpm = bpm
-        self._octave = 4
-        self._duration = 4
         self._pwm = PWM(pin)
         self._pwm.duty_u16(0)
         self._playing = False
+        # 后台播放：由定时器回调逐个音符推进
+        self._timer = None
+        self._queue = []  # 等待播放的旋律
+        self._notes = None  # 正在播放的旋律，依次生成频率和毫秒时长
+        self._sounding = False  # True 时正在发音，否则处于音符间隔
+        self._step_ref = self._step  # 预先绑定，定时器回调中不分配内存
+        self._irq_ref = self._irq
 
     def _tone(self, frequency):
         if frequency <= 0:
@@ -137,76 +415,6 @@ class Music:
             self._pwm.duty_u16(0x8000)
             self._pwm.freq(frequency)
 
-    def _get_frequency_duration(self, note_str):
-        note_split = note_str.lower().split(":")
-        note = 'r'
-        sharp = False
-        note_index = 0
-
-        if len(note_split) > 0:
-            note = note_split[0]
-        if len(note_split) > 1:
-            try:
-                self._duration = int(note_split[1])
-            except ValueError as error:
-                raise ValueError(
-                    f"note '{note_str}' format is incorrect."
-                ) from error
-
-        # note(a, b, c, d, e, f, g, r), note_index(0, 1, 2, 3, 4, 5, 6, 17)
-        note_index = ord(note[0]) - ord("a")
-        if note_index < 0 or (note_index > 6 and note_index != 17):
-            raise ValueError(f"note '{note_str}' format is incorrect.")
-
-        # Like "c4", "c#" or "db"
-        if len(note) == 2:
-            try:
-                # Like "c4"
-                self._octave = int(note[1])
-            except ValueError as error:
-                # Like "c#" or "db"
-                sharp = True
-                if note[1] == "b" and note_index <= 6:
-                    note_index -= 1
-                elif note[1] != "#":
-                    raise ValueError(
-                        f"note '{note_str}' format is incorrect."
-                    ) from error
-        # Like "c#4"
-        elif len(note) == 3:
-            try:
-                self._octave = int(note[2])
-            except ValueError as error:
-                raise ValueError(
-                    f"note '{note_str}' format is incorrect."
-                ) from error
-
-            sharp = True
-            if note[1] == "b" and note_index <= 6:
-                note_index -= 1
-            elif note[1] != "#":
-                raise ValueError(f"note '{note_str}' format is incorrect.")
-        elif len(note) != 1:
-            raise ValueError(f"note '{note_str}' format is incorrect.")
-
-        frequency = 0
-        if note_index <= 6:
-            shift_count = self._octave - 4
-            if sharp:
-                if shift_count > 0:
-                    frequency = _MIDDLE_SHARPS_FREQUENCIES[note_index] \
-                        << shift_count
-                else:
-                    frequency = _MIDDLE_SHARPS_FREQUENCIES[note_index] \
-                        >> -shift_count
-            else:
-                if shift_count > 0:
-                    frequency = _MIDDLE_FREQUENCIES[note_index] << shift_count
-                else:
-                    frequency = _MIDDLE_FREQUENCIES[note_index] >> -shift_count
-
-        return [frequency, self._duration * (60000 / self._bpm / self._ticks)]
-
     def set_tempo(self, ticks=4, bpm=120):
         """Sets the approximate tempo for playback.
         :param int ticks: A number of ticks constitute a beat. Defaults to 4.
@@ -220,59 +428,197 @@ class Music:
         """
         return (self._ticks, self._bpm)
 
-    def play(self, music):
-        """Plays a melody.
-        :param music: The musical DSL.
+    @staticmethod
+    def compile(music):
+        """Compiles a melody to an array('H') of (frequency, ticks) pairs.
+        A compiled melody plays without any parsing and follows the tempo
+        set at playback time.
+        :param music: The musical DSL, or a built-in melody.
         """
-        self._octave = 4
-        self._duration = 4
-
-        if not isinstance(music, (list, str)):
-            raise TypeError("the music type must be a list or string.")
-
+        if isinstance(music, (bytes, bytearray)):
+            stream = array('H')
+            for index in range(0, len(music), 2):
+                stream.append(music[index] | music[index + 1] << 8)
+            return stream
         if isinstance(music, str):
-            frequency_duration = self._get_frequency_duration(music)
-            self.pitch(frequency_duration[0], frequency_duration[1])
-            return
+            music = (music,)
+        elif not isinstance(music, (list, tuple)):
+            raise TypeError("the music type must be a list or string.")
 
+        state = [4, 4]  # octave, duration
+        stream = array('H')
         for note in music:
             if not isinstance(note, str):
                 raise ValueError("the music contains unexpected element.")
+            stream.append(_compile_note(note, state))
+            stream.append(state[1])
+        return stream
+
+    def _stream(self, music):
+        # 已编译的（包括内置曲目）直接使用
+        if isinstance(music, (array, bytes, bytearray)):
+            return music
+        return Music.compile(music)
+
+    @staticmethod
+    def notes(melody):
+        """Returns a compiled or built-in melody in the musical DSL, e.g.
+        Music.notes('NYAN') or Music.notes(Music.NYAN). Every note has its
+        octave and duration, so the list can be edited and played again.
+        :param melody: The name of a built-in melody, or a compiled melody.
+        """
+        if isinstance(melody, str):
+            melody = getattr(Music, melody)
+        stream = Music.compile(melody) if not isinstance(melody, array) else melody
+        return [_note_name(stream[index]) + ':' + str(stream[index + 1])
+                for index in range(0, len(stream), 2)]
+
+    def _timed(self, stream):
+        # 依次生成频率和毫秒时长
+        tempo = self._bpm * self._ticks
+        if isinstance(stream, array):
+            for index in range(0, len(stream), 2):
+                yield stream[index]
+                yield stream[index + 1] * 60000 // tempo
+            return
+        for index in range(0, len(stream), 4):  # 小端的 16 位 (频率, 拍数)
+            yield stream[index] | stream[index + 1] << 8
+            yield (stream[index + 2] | stream[index + 3] << 8) * 60000 // tempo
+
+    def play(self, music, wait=True):
+        """Plays a melody.
+        :param music: The musical DSL, a built-in melody or a melody from `compile`.
+        :param wait: False to play in the background and return at once.
+            Background melodies are driven by a timer and queue up behind
+            the one that is playing.
+        """
+        notes = self._timed(self._stream(music))
+        if not wait:
+            self._queue.append(notes)
+            if self._notes is None:
+                self._step(None)
+            return
+        self.stop()
+        for frequency in notes:
+            self.pitch(frequency, next(notes))
+
+    def _file_notes(self, path):
+        # 从文件中逐块读取，依次生成频率和毫秒时长，内存占用与曲子长度无关
+        with open(path, 'rb') as f:
+            if f.read(len(MELODY_MAGIC)) != MELODY_MAGIC:
+                f.seek(0)
+                for value in _rtttl_notes(f):
+                    yield value
+                return
+            tempo = self._bpm * self._ticks
+            buf = bytearray(_CHUNK_BYTES)
+            while True:
+                count = f.readinto(buf)
+                if not count:
+                    break
+                for index in range(0, count - 3, 4):
+                    yield buf[index] | buf[index + 1] << 8
+                    yield (buf[index + 2] | buf[index + 3] << 8) * 60000 // tempo
+
+    def play_file(self, path, wait=True):
+        """Plays a melody streamed from a file, in RTTTL or in the binary
+        format written by `save`. Only a small chunk is held in memory.
+        :param path: The file path.
+        :param wait: False to play in the background, see `play`.
+        """
+        notes = self._file_notes(path)
+        if not wait:
+            self._queue.append(notes)
+            if self._notes is None:
+                self._step(None)
+            return
+        self.stop()
+        for frequency in notes:
+            self.pitch(frequency, next(notes))
+
+    @staticmethod
+    def save(music, path):
+        """Saves a melody in the binary format read by `play_file`:
+        MELODY_MAGIC, then (frequency, ticks) pairs of little endian 16-bit values.
+        :param music: The musical DSL, a built-in melody or a melody from `compile`.
+        :param path: The file path.
+        """
+        if isinstance(music, (bytes, bytearray)):
+            data = music
+        else:
+            stream = music if isinstance(music, array) else Music.compile(music)
+            data = bytearray(len(stream) * 2)
+            for index in range(len(stream)):
+                data[index * 2] = stream[index] & 0xFF
+                data[index * 2 + 1] = stream[index] >> 8
+        with open(path, 'wb') as f:
+            f.write(MELODY_MAGIC)
+            f.write(data)
+
+    def _irq(self, timer):
+        micropython.schedule(self._step_ref, None)
+
+    def _arm(self, duration):
+        if self._timer is None:
+            self._timer = Timer()
+        self._timer.init(mode=Timer.ONE_SHOT, period=duration, callback=self._irq_ref)
+
+    def _step(self, _):
+        # 结束当前音符进入间隔，或开始下一个音符
+        if self._sounding:
+            self._tone(0)
+            self._sounding = False
+            self._arm(_ARTICULATION_MS)
+            return
+        while True:
+            if self._notes is None:
+                if not self._queue:
+                    return
+                self._notes = self._queue.pop(0)
+            try:
+                frequency = next(self._notes)
+                duration = next(self._notes)
+                break
+            except StopIteration:
+                self._notes = None
+            except Exception:  # 格式错误的 RTTTL 或读文件出错：丢弃这首，接着播放下一首
+                self._notes.close()
+                self._notes = None
+                self._tone(0)
+        self._tone(frequency)
+        self._sounding = True
+        duration -= _ARTICULATION_MS
+        self._arm(duration if duration > 0 else 10)
 
-            frequency_duration = self._get_frequency_duration(note)
-            self.pitch(frequency_duration[0], frequency_duration[1])
+    def is_playing(self):
+        """Returns True while a melody plays in the background or asynchronously."""
+        return self._notes is not None or self._playing
 
     async def play_async(self, music):
         """Asynchronously plays a melody.
-        :param music: The musical DSL.
+        :param music: The musical DSL, a built-in melody or a melody from `compile`.
         """
-        self._octave = 4
-        self._duration = 4
-        self._playing = True
-
-        if not isinstance(music, (list, str)):
-            raise TypeError("the music type must be a list or string.")
-
-        if isinstance(music, str):
-            frequency_duration = self._get_frequency_duration(music)
-            await self.pitch_async(
-                frequency_duration[0], frequency_duration[1]
-            )
-            return
+        await self._play_notes_async(self._timed(self._stream(music)))
 
-        for note in music:
-            if not isinstance(note, str):
-                raise ValueError("the music contains unexpected element.")
+    async def play_file_async(self, path):
+        """Asynchronously plays a melody streamed from a file, see `play_file`.
+        :param path: The file path.
+        """
+        await self._play_notes_async(self._file_notes(path))
 
-            if not self._playing:
-                break
+    async def _play_notes_async(self, notes):
+        self._playing = True
 
-            frequency_duration = self._get_frequency_duration(note)
-            await self.pitch_async(
-                frequency_duration[0], frequency_duration[1]
-            )
+        try:
+            for frequency in notes:
+                if not self._playing:
+                    break
 
-        self._playing = False
+                await self.pitch_async(frequency, next(notes))
+        finally:
+            notes.close()
+            self._playing = False
+            self._tone(0)
 
     def pitch(self, frequency, duration=-1):
         """Plays a pitch at the integer frequency given for the specified
@@ -285,9 +631,9 @@ class Music:
             duration -= _ARTICULATION_MS
             if duration < 0:
                 duration = 10
-            utime.sleep(duration / 1000)
+            utime.sleep_ms(int(duration))
             self._tone(0)
-            utime.sleep(_ARTICULATION_MS / 1000)
+            utime.sleep_ms(_ARTICULATION_MS)
 
     async def pitch_async(self, frequency, duration=-1):
         """Asynchronously plays a pitch at the integer frequency given for the
@@ -300,20 +646,30 @@ class Music:
             duration -= _ARTICULATION_MS
             if duration < 0:
                 duration = 10
-            await uasyncio.sleep(duration / 1000)
+            await uasyncio.sleep_ms(int(duration))
             self._tone(0)
-            await uasyncio.sleep(_ARTICULATION_MS / 1000)
+            await uasyncio.sleep_ms(_ARTICULATION_MS)
 
     def stop(self):
         """Stops the music playback.
-        In fact, works only for `play_async(music)`.
+        Works for `play_async(music)` and `play(music, wait=False)`, and
+        drops the melodies waiting in the queue.
         """
         self._playing = False
+        for notes in self._queue:
+            notes.close()  # 关闭正在读取的文件
+        self._queue = []
+        if self._notes is not None:
+            self._notes.close()
+            self._notes = None
+        if self._timer is not None:
+            self._timer.deinit()
+        if self._sounding:
+            self._tone(0)
+            self._sounding = False
 
     def reset(self):
         """Resets to default state.
         """
         self._ticks = 4
-        self._bpm = 120
-        self._octave = 4
-        self._duration = 4
\ No newline at end of file
+        self._bpm = 120
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+`picoed.tiled`
+====================================================
+
+One large canvas shown across several IS31FL3731 matrices on the same
+I2C bus, Pico:ed panels by default.
+
+"""
+
+import framebuf
+from micropython import const
+from .is31fl3731 import IS31FL3731
+from .display import Display
+from . import kernels
+
+_FRAME_BYTES = const(144)  # 每帧 144 个 PWM 寄存器
+_FLIP_FRAMES = (0, 1)  # 双缓冲使用的两帧
+_BLANK_BUFFER = bytes(_FRAME_BYTES)
+
+
+class PicoedPanel(IS31FL3731):
+    """A Pico:ed matrix used as one panel of a `VirtualDisplay`: the pixel
+    layout of `Display` without its canvas, fonts and caches.
+    """
+
+    width = Display.width
+    height = Display.height
+    pixel_addr = staticmethod(Display.pixel_addr)
+
+    def _init(self, frames=None):
+        # 面板只用 0、1 两帧做双缓冲
+        super()._init(frames if frames else _FLIP_FRAMES)
+
+
+class VirtualDisplay():
+    """Maps a canvas onto a grid of panels of the same size, one IS31FL3731
+    per panel. The panels are laid out left to right, then top to bottom, in
+    the order of their addresses. `flush()` only writes the panels whose part
+    of the canvas changed since they were last shown, so the cost of a frame
+    grows with what changed rather than with the number of panels, e.g.
+
+        screen = VirtualDisplay(i2c, (0x74, 0x75, 0x76, 0x77))
+        screen.framebuf.text('PICO', 0, 0, 30)
+        screen.flush()
+
+    Other IS31FL3731 boards are tiled by passing their class, e.g.
+    `panel=Matrix` for a driver that defines width, height and pixel_addr.
+    """
+
+    def __init__(self, i2c, addresses, columns=None, panel=None):
+        """
+        :param i2c: the I2C bus all the chips are on
+        :param addresses: the I2C address of each panel
+        :param columns: panels per row, defaults to all panels in one row
+        :param panel: class or factory called as panel(i2c, address) for each
+            panel, defaults to `PicoedPanel`
+        """
+        if panel is None:
+            panel = PicoedPanel
+        if columns is None:
+            columns = len(addresses)
+        self.tiles = [panel(i2c, address) for address in addresses]
+        tile_width = self.tiles[0].width
+        tile_height = self.tiles[0].height
+        self._tile_width = tile_width
+        self._tile_height = tile_height
+        self.columns = columns
+        self.rows = (len(addresses) + columns - 1) // columns
+        self.width = columns * tile_width
+        self.height = self.rows * tile_height
+        self.canvas = bytearray(self.width * self.height)  # 画布，每个像素一字节亮度，按行排列
+        self.framebuf = framebuf.FrameBuffer(self.canvas, self.width, self.height, framebuf.GS8)
+        # 每种面板一张寄存器地址表，按行排列 (y * 宽 + x)
+        luts = {}
+        self._luts = []
+        for tile in self.tiles:
+            lut = luts.get(type(tile))
+            if lut is None:
+                lut = luts[type(tile)] = bytes(
+                    tile.pixel_addr(x, y) for y in range(tile_height) for x in range(tile_width))
+            self._luts.append(lut)
+        self._tile = bytearray(tile_width * tile_height)  # 从画布中截取一块的缓冲区
+        self._buffer = bytearray(_FRAME_BYTES)  # 一块面板的 PWM 寄存器
+        self._shown = [None] * len(addresses)  # 每块最后一次显示的内容，None 表示还没显示过
+
+    def _crop(self, index):
+        # 把第 index 块从画布复制到 self._tile
+        canvas = self.canvas
+        tile = self._tile
+        width = self.width
+        tile_width = self._tile_width
+        start = (index // self.columns) * self._tile_height * width + (index % self.columns) * tile_width
+        for y in range(self._tile_height):
+            row = start + y * width
+            tile[y * tile_width:(y + 1) * tile_width] = canvas[row:row + tile_width]
+        return tile
+
+    def _show(self, index, tile):
+        # 写入面板的后台帧，然后切换显示
+        panel = self.tiles[index]
+        buffer = self._buffer
+        buffer[:] = _BLANK_BUFFER
+        kernels.scatter(tile, self._luts[index], buffer, len(tile))
+        back = 0 if panel.frame() else 1
+        panel._write_color(buffer, back)
+        panel.frame(back)
+
+    def flush(self):
+        """Shows the canvas, writing only the panels whose part changed.
+        Returns the number of panels written.
+        """
+        written = 0
+        for index in range(len(self.tiles)):
+            tile = self._crop(index)
+            shown = self._shown[index]
+            if shown == tile:
+                continue
+            self._show(index, tile)
+            if shown is None:
+                self._shown[index] = bytearray(tile)
+            else:
+                shown[:] = tile
+            written += 1
+        return written
+
+    def pixel(self, x, y, value=None):
+        """Gets or sets the brightness 0->255 of a pixel of the canvas."""
+        return self.framebuf.pixel(x, y) if value is None else self.framebuf.pixel(x, y, value)
+
+    def clear(self):
+        """Clears the canvas and every panel."""
+        self.framebuf.fill(0)
+        self._shown = [None] * len(self.tiles)
+        self.flush()
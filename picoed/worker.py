@@ -0,0 +1,101 @@
+"""
+`picoed.worker`
+====================================================
+
+Runs the updates of the Pico:ed display on the second core of the RP2040.
+
+"""
+
+import _thread
+import utime
+from micropython import const
+
+_PIXELS = const(119)  # 17 x 7, the size of `Display.canvas`
+
+
+class RenderWorker():
+    """Flushes frames and scrolls text for a Display on another thread.
+    On the Pico:ed the thread runs on core 1, on a host CPython it is an
+    ordinary thread. Application code hands the work over and returns at once;
+    the newest frame or text replaces whatever the worker is showing.
+    Do not use the display from the application while the worker runs.
+    A job that fails is skipped and its exception is kept in `error`.
+    """
+
+    def __init__(self, display):
+        self._display = display
+        self._lock = _thread.allocate_lock()
+        # 双缓冲：应用写 _back，工作线程在锁内与 _front 交换后显示 _front
+        self._back = bytearray(_PIXELS)
+        self._front = bytearray(_PIXELS)
+        self._frame_ready = False
+        self._text = None  # 待滚动的 (value, brightness, fonts, fps)
+        self._running = False
+        self._stopped = True
+        self.error = None  # 最近一项失败的工作抛出的异常
+
+    def start(self):
+        """Starts the worker thread."""
+        if not self._stopped:
+            return
+        self._running = True
+        self._stopped = False
+        _thread.start_new_thread(self._run, ())
+
+    def stop(self):
+        """Stops the worker thread and waits for it to finish the current frame."""
+        self._running = False
+        while not self._stopped:
+            utime.sleep_ms(1)
+
+    def submit(self, canvas):
+        """Hands over a frame in the layout of `Display.canvas` and returns at once.
+        :param canvas: 119 bytes, the brightness 0->255 of each LED row by row
+        """
+        if len(canvas) != _PIXELS:
+            raise ValueError("canvas must be 119 bytes")
+        with self._lock:
+            self._back[:] = canvas
+            self._frame_ready = True
+            self._text = None
+
+    def submit_text(self, value, brightness=30, fonts=None, fps=15):
+        """Hands over a number or text to scroll and returns at once."""
+        with self._lock:
+            self._text = (value, brightness, fonts, fps)
+            self._frame_ready = False
+
+    def busy(self):
+        """Returns True while there is work the worker has not taken yet."""
+        return self._frame_ready or self._text is not None
+
+    def _take(self):
+        # 在锁内取走待处理的工作，返回 (是否有帧, 文本)
+        with self._lock:
+            if self._frame_ready:
+                self._back, self._front = self._front, self._back
+                self._frame_ready = False
+                return True, None
+            text = self._text
+            self._text = None
+            return False, text
+
+    def _abort(self):
+        return not self._running or self.busy()  # 有新的工作就放弃当前滚动
+
+    def _run(self):
+        try:
+            while self._running:
+                frame, text = self._take()
+                try:
+                    if frame:
+                        self._display.flush(self._front)
+                    elif text is not None:
+                        value, brightness, fonts, fps = text
+                        self._display.scroll(value, brightness, fonts, fps, abort=self._abort)
+                    else:
+                        utime.sleep_ms(1)
+                except Exception as error:  # 一项工作失败不影响后面的工作
+                    self.error = error
+        finally:
+            self._stopped = True
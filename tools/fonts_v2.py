@@ -0,0 +1,78 @@
+"""
+`fonts_v2`
+====================================================
+
+Converts a fonts.bin from the original format to the indexed v2 format.
+Runs on a host computer with CPython:
+
+    python3 tools/fonts_v2.py picoed/fonts.bin picoed/fonts.bin
+
+Original format:
+    2 bytes     offset of the glyphs, little endian
+    n bytes     the characters of the font, UTF-8 encoded
+    7 bytes     one glyph per character, in the same order
+
+v2 format:
+    2 bytes     0xFFFF, never a valid offset in the original format
+    2 bytes     number of glyphs, little endian
+    2 bytes     one code point per glyph, little endian, sorted ascending
+    7 bytes     one glyph per code point, in the same order
+
+"""
+
+import sys
+
+OFFSET_BYTES = 2
+FONT_BYTES = 7
+V2_MARK = 0xFFFF
+
+
+def read_fonts(data):
+    """Returns a list of (code point, glyph) from fonts.bin data in either format"""
+    offset = int.from_bytes(data[:OFFSET_BYTES], 'little')
+    if offset == V2_MARK:
+        count = int.from_bytes(data[2:4], 'little')
+        glyphs = 4 + count * 2
+        return [
+            (int.from_bytes(data[4 + i * 2:6 + i * 2], 'little'),
+             data[glyphs + i * FONT_BYTES:glyphs + (i + 1) * FONT_BYTES])
+            for i in range(count)
+        ]
+    chars = data[OFFSET_BYTES:offset].decode('utf-8')
+    fonts = []
+    for index, char in enumerate(chars):
+        fonts.append((ord(char), data[offset + index * FONT_BYTES:offset + (index + 1) * FONT_BYTES]))
+    return fonts
+
+
+def write_fonts(fonts):
+    """Returns fonts.bin v2 data for a list of (code point, glyph)"""
+    table = {}
+    for code, glyph in fonts:
+        if code > 0xFFFF:
+            raise ValueError('U+{:X} is outside the Basic Multilingual Plane'.format(code))
+        table.setdefault(code, glyph)  # 与 str.find 一致，重复的字取第一个
+    codes = sorted(table)
+    data = bytearray(V2_MARK.to_bytes(2, 'little'))
+    data += len(codes).to_bytes(2, 'little')
+    for code in codes:
+        data += code.to_bytes(2, 'little')
+    for code in codes:
+        data += table[code]
+    return bytes(data)
+
+
+def main(source, target):
+    with open(source, 'rb') as f:
+        fonts = read_fonts(f.read())
+    data = write_fonts(fonts)
+    with open(target, 'wb') as f:
+        f.write(data)
+    print('{} glyphs, {} bytes'.format(len(fonts), len(data)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print('usage: fonts_v2.py SOURCE TARGET')
+        sys.exit(1)
+    main(sys.argv[1], sys.argv[2])